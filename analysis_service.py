@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Analysis Service
+
+A long-running local HTTP service around the combined analysis pipeline, so that a job
+runner does not pay interpreter start-up, NLTK import and lexicon loading for every
+transcript. It uses only the standard library (asyncio) and listens on a TCP port or a
+Unix socket.
+
+Endpoints:
+
+    POST /analyze   The request body is a transcript: JSON (as stored in transcript files)
+                    or plain text (Content-Type: text/plain), which is converted in memory.
+                    Query parameters 'name', 'candidate' and 'interviewer' are optional.
+                    Responds with the combined result row, as written to the pipeline CSV.
+    GET  /health    Reports the number of requests in flight and the capacity.
+
+Scoring runs in a process pool whose workers load the analyzers once, at start-up.
+At most --workers requests are scored at a time and at most --max-pending are
+admitted; requests beyond that are refused immediately with 503 and a Retry-After
+header, before their body is read, so callers back off instead of piling up. If a
+worker process dies, its request fails and the pool is restarted and warmed up.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import log_config
+import nltk_resources
+from combined_analysis_pipeline import analyze_loaded_transcript, cache_version
+from result_cache import ResultCache
+from transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BODY = 16 * 1024 * 1024
+
+
+def _init_service_worker(nltk_data=None, log_settings=None):
+    """Builds the analyzers once per worker process so requests are served warm."""
+    if log_settings:
+        log_config.configure(**log_settings)
+    if nltk_data:
+        nltk_resources.set_data_dir(nltk_data)
+    from sentiment_analyzer import get_sentiment_analyzer
+    get_sentiment_analyzer()
+    nltk_resources.sentence_tokenizer()
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def analyze_payload(body, content_type, name, metadata):
+    """
+    Parses a transcript from a request body and runs both analyzers on it.
+
+    Args:
+        body (bytes): The transcript, as JSON or plain text.
+        content_type (str): The request's Content-Type.
+        name (str): Name reported in the 'transcript_name' column.
+        metadata (dict): Interview fields from the query string (candidate, interviewer).
+
+    Returns:
+        tuple: (result, error); result is None and error a message if the transcript could not be analyzed.
+    """
+    try:
+        text = body.decode('utf-8')
+    except UnicodeDecodeError:
+        text = body.decode('latin-1')
+
+    try:
+        if content_type.startswith('text/plain'):
+            from transcript_converter import parse_text
+            data, _ = parse_text(text, metadata={'interview': {**metadata, 'transcript': []}})
+        else:
+            data = json.loads(text)
+            if metadata and isinstance(data, dict) and isinstance(data.get('interview'), dict):
+                data['interview'].update(metadata)
+        transcript = Transcript.from_dict(data, source=name)
+    except (json.JSONDecodeError, ValueError) as e:
+        return None, f"Invalid transcript: {str(e)}"
+
+    result = analyze_loaded_transcript(transcript, name)
+    if result is None:
+        return None, "Analysis failed."
+    return result, None
+
+
+class AnalysisService:
+    """Serves analysis requests from a warm process pool with bounded concurrency."""
+
+    def __init__(self, workers=2, max_pending=None, cache=None, max_body=DEFAULT_MAX_BODY, nltk_data=None):
+        """
+        Args:
+            workers (int): Worker processes, i.e. requests scored at the same time.
+            max_pending (int, optional): Requests admitted at once, running or waiting (default: 4 per worker).
+            cache (ResultCache, optional): Cache of results keyed on the request body.
+            max_body (int): Largest request body accepted, in bytes.
+            nltk_data (str, optional): Local NLTK data directory for the workers.
+        """
+        self.workers = workers
+        self.max_pending = max_pending or workers * 4
+        self.cache = cache
+        self.max_body = max_body
+        self.nltk_data = nltk_data
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+        self.restarts = 0
+
+        self._executor = self._new_executor()
+        self._slots = None
+
+    def _new_executor(self):
+        # Workers start from a fork server, so a pool restarted mid-service does not inherit open sockets
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('forkserver'),
+                                   initializer=_init_service_worker,
+                                   initargs=(self.nltk_data, log_config.settings()))
+
+    async def start(self):
+        """Starts every worker process and loads its analyzers before the first request arrives."""
+        self._slots = asyncio.Semaphore(self.workers)
+        await self._warm_up()
+
+    async def _warm_up(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up) for _ in range(self.workers)))
+
+    async def _restart(self, broken):
+        # Every request in flight fails when a worker dies; only the first to notice restarts the pool
+        if self._executor is not broken:
+            return
+        logger.error("A worker process died; restarting the process pool")
+        self.restarts += 1
+        self._executor = self._new_executor()
+        broken.shutdown(wait=False)
+        await self._warm_up()
+
+    def close(self):
+        self._executor.shutdown()
+
+    async def analyze(self, body, content_type, name, metadata):
+        """
+        Scores one transcript, waiting for a free worker.
+
+        Returns:
+            tuple: (status, response dictionary)
+        """
+        key = None
+        if self.cache:
+            key = self.cache.make_key(body, cache_version() + content_type + json.dumps(metadata, sort_keys=True))
+            result = self.cache.get(key)
+            if result is not None:
+                result['transcript_name'] = name
+                return HTTPStatus.OK, result
+
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            executor = self._executor
+            try:
+                result, error = await loop.run_in_executor(executor, analyze_payload,
+                                                           body, content_type, name, metadata)
+                died = False
+            except BrokenProcessPool:
+                died = True
+        if died:
+            await self._restart(executor)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "The worker process died."}
+        if error:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": error}
+
+        if key:
+            self.cache.put(key, result)
+        return HTTPStatus.OK, result
+
+    async def handle_connection(self, reader, writer):
+        """Serves the HTTP/1.1 requests of one connection, keeping it alive between requests."""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                status, response, headers, keep_alive = await self._dispatch(*request)
+                await self._write_response(writer, status, response, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            return 'BAD', '', 'HTTP/1.0', {}, b''
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            header, _, value = line.decode('latin-1').partition(':')
+            headers[header.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > self.max_body:
+            return 'TOO_LARGE' if length > 0 else 'BAD', target, version, headers, b''
+
+        # Admit analysis requests before reading their body, so refused ones never buffer it
+        admitted = method == 'POST' and urlsplit(target).path == '/analyze'
+        if admitted:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return 'BUSY', target, version, headers, b''
+            self.pending += 1
+
+        try:
+            body = await reader.readexactly(length) if length else b''
+        except BaseException:
+            if admitted:
+                self.pending -= 1
+            raise
+        return method, target, version, headers, body
+
+    async def _dispatch(self, method, target, version, headers, body):
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        url = urlsplit(target)
+
+        if method == 'BAD':
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request."}, {}, False
+        if method == 'TOO_LARGE':
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large."}, {}, False
+        if method == 'BUSY':
+            # The body was left unread, so the connection cannot be reused
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Server busy, retry later."}, {'Retry-After': '1'}, False
+
+        if url.path == '/health' and method == 'GET':
+            return HTTPStatus.OK, {
+                "status": "ok",
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "served": self.served,
+                "rejected": self.rejected,
+                "restarts": self.restarts
+            }, {}, keep_alive
+
+        if url.path != '/analyze':
+            return HTTPStatus.NOT_FOUND, {"error": "Not found."}, {}, keep_alive
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST."}, {'Allow': 'POST'}, keep_alive
+
+        # The request was admitted (and counted as pending) by _read_request
+        query = {field: values[-1] for field, values in parse_qs(url.query).items()}
+        name = query.pop('name', 'request')
+        metadata = {field: query[field] for field in ('candidate', 'interviewer') if field in query}
+
+        try:
+            status, response = await self.analyze(body, headers.get('content-type', 'application/json'), name, metadata)
+        except Exception as e:
+            logger.error("Error analyzing %s: %s", name, e, exc_info=True)
+            status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        finally:
+            self.pending -= 1
+        self.served += 1
+        return status, response, {}, keep_alive
+
+    @staticmethod
+    async def _write_response(writer, status, response, headers, keep_alive):
+        payload = json.dumps(response).encode('utf-8')
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        lines.extend(f"{header}: {value}" for header, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + payload)
+        await writer.drain()
+
+
+async def serve(service, host='127.0.0.1', port=8080, unix_socket=None):
+    """
+    Starts the service's workers and serves requests until cancelled.
+
+    Args:
+        service (AnalysisService): The service to run.
+        host (str): Address to listen on.
+        port (int): TCP port to listen on.
+        unix_socket (str, optional): Listen on this Unix socket path instead of TCP.
+    """
+    await service.start()
+    if unix_socket:
+        server = await asyncio.start_unix_server(service.handle_connection, path=unix_socket)
+        logger.info("Serving on %s with %d workers", unix_socket, service.workers)
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        logger.info("Serving on http://%s:%d with %d workers", host, port, service.workers)
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Main function to parse arguments and run the service."""
+    parser = argparse.ArgumentParser(description='Serve transcript analysis over HTTP with warm analyzers.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='TCP port to listen on (default: 8080)')
+    parser.add_argument('--unix-socket', help='Listen on a Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes scoring requests (default: 2)')
+    parser.add_argument('--max-pending', type=int,
+                        help='Requests admitted at once before answering 503 (default: 4 per worker)')
+    parser.add_argument('--max-body-mb', type=int, default=16, help='Largest request body in MB (default: 16)')
+    parser.add_argument('--cache-dir', help='Directory for cached results (default: no cache)')
+    parser.add_argument('--cache-max-mb', type=int, default=512, help='Maximum size of the result cache in MB (default: 512)')
+    parser.add_argument('--nltk-data', help='Local NLTK data directory with vader_lexicon and punkt')
+    log_config.add_arguments(parser)
+
+    args = parser.parse_args()
+    log_config.configure_from_args(args)
+
+    if args.workers < 1:
+        logger.error("--workers must be at least 1.")
+        return 1
+
+    if args.nltk_data:
+        nltk_resources.set_data_dir(args.nltk_data)
+
+    # Fail at start-up rather than in every worker if the NLTK data is missing
+    try:
+        nltk_resources.require('vader_lexicon')
+        nltk_resources.require(nltk_resources.punkt_resource())
+    except nltk_resources.MissingNLTKDataError as e:
+        logger.error("%s", e)
+        return 1
+
+    cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    service = AnalysisService(args.workers, args.max_pending, cache, args.max_body_mb * 1024 * 1024, args.nltk_data)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,34 +8,42 @@ and outputs the results.
 
 import argparse
 import json
+import logging
 import os
+import log_config
+import nltk_resources
 from sentiment_analyzer import analyze_sentiment, summarize_sentiment
+from transcript import load_transcript
+
+logger = logging.getLogger(__name__)
 
 def main():
     """Main function to parse arguments and run the sentiment analysis."""
     parser = argparse.ArgumentParser(description='Analyze sentiment in a transcript file.')
     parser.add_argument('file', help='Path to the transcript file (text or JSON)')
     parser.add_argument('--output', help='Output JSON file path (default: sentiment_results.json)')
+    parser.add_argument('--nltk-data', help='Local NLTK data directory with vader_lexicon and punkt')
+    log_config.add_arguments(parser)
     
     args = parser.parse_args()
+    log_config.configure_from_args(args)
+    
+    if args.nltk_data:
+        nltk_resources.set_data_dir(args.nltk_data)
     
     # Determine input file type and process accordingly
     input_file = args.file
     output_file = args.output or 'sentiment_results.json'
     
-    # Check if input is a text file that needs conversion
-    if input_file.endswith('.txt'):
-        # Import transcript converter
-        from transcript_converter import process_file
-        
-        # Convert text to JSON
-        json_file, _ = process_file(input_file)
-        print(f"Converted text transcript to JSON: {json_file}")
-        input_file = json_file
-    
-    # Analyze sentiment
-    print(f"Analyzing sentiment in {input_file}...")
-    sentiment_results = analyze_sentiment(input_file)
+    # Text transcripts are loaded in memory, with the same speaker inference as the
+    # pipeline, so nothing is written next to the input
+    logger.info("Analyzing sentiment in %s...", input_file)
+    try:
+        transcript = load_transcript(input_file)
+    except (OSError, ValueError) as e:
+        logger.error("Error loading transcript %s: %s", input_file, e)
+        return
+    sentiment_results = analyze_sentiment(transcript)
     
     if sentiment_results:
         # Summarize the sentiment
@@ -68,9 +76,9 @@ def main():
         print(f"  - Neutral: {sentiment_summary['interviewer']['neutral_percentage']:.1f}%")
         print(f"  - Compound score: {sentiment_summary['interviewer']['compound_score']:.2f}")
         
-        print(f"\nFull results saved to {output_file}")
+        logger.info("Full results saved to %s", output_file)
     else:
-        print("Sentiment analysis failed. Check the error messages above.")
+        logger.error("Sentiment analysis failed. Check the error messages above.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
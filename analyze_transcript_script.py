@@ -8,19 +8,28 @@ and outputs the results.
 
 import argparse
 import json
+import logging
 import os
 import sys
-import traceback
-from transcript_analyzer import analyze_transcript
+import log_config
+from transcript_analyzer import EVIDENCE_HITS, analyze_transcript
+from rubric import load_rubric
+
+logger = logging.getLogger(__name__)
 
 def main():
     """Main function to parse arguments and run the transcript analysis."""
     parser = argparse.ArgumentParser(description='Analyze a transcript file.')
     parser.add_argument('file', help='Path to the transcript file (text or JSON)')
     parser.add_argument('--output', help='Output JSON file path (default: transcript_analysis_results.json)')
+    parser.add_argument('--rubric', help='Rubric file (JSON or YAML) to score against (default: rubrics/default.json)')
+    parser.add_argument('--evidence', type=int, default=EVIDENCE_HITS,
+                        help=f'Keyword hits listed as evidence per criterion, 0 for none (default: {EVIDENCE_HITS})')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode for more detailed output')
+    log_config.add_arguments(parser)
     
     args = parser.parse_args()
+    log_config.configure_from_args(args)
     debug_mode = args.debug
     
     try:
@@ -28,61 +37,44 @@ def main():
         input_file = args.file
         output_file = args.output or 'transcript_analysis_results.json'
         
-        print(f"Starting analysis of: {input_file}")
+        logger.info("Starting analysis of: %s", input_file)
         
         # Check if the input file exists
         if not os.path.exists(input_file):
-            print(f"ERROR: Input file '{input_file}' does not exist.")
+            logger.error("Input file '%s' does not exist.", input_file)
             return 1
         
-        # Check if input is a text file that needs conversion
-        if input_file.endswith('.txt'):
-            try:
-                # Import transcript converter
-                from transcript_converter import process_file
-                
-                # Convert text to JSON
-                print(f"Converting text transcript to JSON...")
-                json_file, _ = process_file(input_file)
-                print(f"Converted text transcript to JSON: {json_file}")
-                input_file = json_file
-            except Exception as e:
-                print(f"ERROR during transcript conversion: {str(e)}")
-                if debug_mode:
-                    traceback.print_exc()
-                return 1
-        
-        # Analyze transcript
-        print(f"Analyzing transcript in {input_file}...")
+        # Text transcripts are parsed in memory by analyze_transcript, with the same speaker
+        # inference as the pipeline, so nothing is written next to the input
+        logger.info("Analyzing transcript in %s...", input_file)
         
         # Debug: Print the first few lines of the file
         if debug_mode:
             try:
                 with open(input_file, 'r', encoding='utf-8') as f:
                     content = f.read(500)  # Read first 500 chars
-                    print(f"\nFile content preview:\n{content}...\n")
+                    logger.info("File content preview:\n%s...", content)
             except Exception as e:
-                print(f"Could not read file for preview: {str(e)}")
+                logger.warning("Could not read file for preview: %s", e)
         
-        analysis_results = analyze_transcript(input_file)
+        rubric = load_rubric(args.rubric) if args.rubric else None
+        analysis_results = analyze_transcript(input_file, rubric, args.evidence)
         
         if analysis_results is None:
-            print("ERROR: analyze_transcript returned None")
+            logger.error("analyze_transcript returned None")
             return 1
         
         if "error" in analysis_results:
-            print(f"ERROR during analysis: {analysis_results['error']}")
+            logger.error("Error during analysis: %s", analysis_results['error'])
             return 1
         
         # Write results to file
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
                 json.dump(analysis_results, f, indent=2)
-            print(f"Results saved to: {output_file}")
+            logger.info("Results saved to: %s", output_file)
         except Exception as e:
-            print(f"ERROR saving results to file: {str(e)}")
-            if debug_mode:
-                traceback.print_exc()
+            logger.error("Error saving results to file: %s", e, exc_info=debug_mode)
         
         # Print summary to console
         print("\nTranscript Analysis Results:")
@@ -95,13 +87,10 @@ def main():
             else:
                 print(f"  {criterion}: N/A")
         
-        print(f"\nFull results saved to {output_file}")
         return 0
         
     except Exception as e:
-        print(f"ERROR: An unexpected error occurred: {str(e)}")
-        if debug_mode:
-            traceback.print_exc()
+        logger.error("An unexpected error occurred: %s", e, exc_info=debug_mode)
         return 1
 
 if __name__ == "__main__":
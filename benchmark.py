@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark
+
+Times each stage of the analysis on deterministic synthetic transcripts, so that the
+effect of a change on batch runs can be measured and tracked over time.
+
+Stages:
+    parse      text transcript -> turn records, in memory
+    convert    text transcript file -> JSON transcript file
+    load       JSON transcript file -> Transcript
+    rubric     rubric scoring of a loaded transcript (analyze_transcript, without evidence)
+    sentiment  sentiment scoring of a loaded transcript (analyze_sentiment)
+    csv        writing result rows with ResultCSVWriter
+
+Each stage is run --repeat times on fresh inputs and reports its best and median
+time, throughput in turns/sec and MB/sec of transcript text, and peak traced memory
+(measured in a separate run, since tracing slows Python down). The report is JSON,
+for comparing runs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import log_config
+from combined_analysis_pipeline import ResultCSVWriter, analyze_loaded_transcript
+from transcript import load_transcript
+from transcript_analyzer import DEFAULT_RUBRIC, analyze_transcript
+from transcript_converter import get_line_parser, process_file
+
+logger = logging.getLogger(__name__)
+
+# Everyday words the synthetic dialogue is made of, besides rubric keywords
+_FILLER = (
+    "the a an and of to in it is that this we you i so for on with as be at or but not "
+    "have can will would just like then there here what when now okay right yeah well "
+    "number array list value loop index function return input output string result first "
+    "next each other one two three four five zero left right start end problem code test"
+).split()
+
+_STAGES = ('parse', 'convert', 'load', 'rubric', 'sentiment', 'csv')
+
+
+def generate_transcript(turns=200, words_per_turn=40, keyword_density=0.05, seed=0, rubric=DEFAULT_RUBRIC):
+    """
+    Generates a synthetic interview as a text transcript, the same for the same arguments.
+
+    Args:
+        turns (int): Number of turns, alternating between interviewer and candidate.
+        words_per_turn (int): Average number of words per turn.
+        keyword_density (float): Share of words that are rubric keywords or phrases.
+        seed (int): Seed of the random generator.
+        rubric (Rubric): Rubric whose keywords are sprinkled in.
+
+    Returns:
+        str: Lines of "Speaker [m:ss]: dialogue".
+    """
+    rng = random.Random(seed)
+    keywords = sorted({keyword for criterion in rubric.criteria
+                       for keywords in criterion['keyword_groups'].values()
+                       for keyword in keywords})
+
+    lines = []
+    seconds = 0
+    for turn_index in range(turns):
+        speaker = "Interviewer" if turn_index % 2 == 0 else "Candidate"
+        word_count = max(1, int(rng.gauss(words_per_turn, words_per_turn / 4)))
+        words = [rng.choice(keywords) if keywords and rng.random() < keyword_density else rng.choice(_FILLER)
+                 for _ in range(word_count)]
+
+        # Break the turn into sentences of 6 to 15 words
+        sentences = []
+        while words:
+            length = rng.randint(6, 15)
+            sentence = " ".join(words[:length])
+            words = words[length:]
+            sentences.append(sentence[0].upper() + sentence[1:] + rng.choice(".?."))
+
+        lines.append(f"{speaker} [{seconds // 60}:{seconds % 60:02d}]: {' '.join(sentences)}")
+        seconds += rng.randint(3, 40)
+
+    return "\n".join(lines) + "\n"
+
+
+def _measure(run, setup, repeat):
+    """Times run(setup()) repeat times, then measures its peak memory in one traced run."""
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return times, peak
+
+
+def run_benchmark(turns=200, words_per_turn=40, keyword_density=0.05, transcripts=20, repeat=5,
+                  seed=0, stages=_STAGES):
+    """
+    Benchmarks the analysis stages on synthetic transcripts.
+
+    Args:
+        turns (int): Turns per transcript.
+        words_per_turn (int): Average words per turn.
+        keyword_density (float): Share of words that are rubric keywords.
+        transcripts (int): Transcripts processed per measurement (and CSV rows written).
+        repeat (int): Timed runs per stage.
+        seed (int): Seed of the first transcript; transcript i uses seed + i.
+        stages (tuple): Names of the stages to run.
+
+    Returns:
+        dict: The machine-readable report.
+    """
+    texts = [generate_transcript(turns, words_per_turn, keyword_density, seed + i) for i in range(transcripts)]
+    text_bytes = sum(len(text.encode('utf-8')) for text in texts)
+    total_turns = turns * transcripts
+
+    report = {
+        'benchmark': 'transcript-analyzer',
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'turns': turns,
+            'words_per_turn': words_per_turn,
+            'keyword_density': keyword_density,
+            'transcripts': transcripts,
+            'repeat': repeat,
+            'seed': seed
+        },
+        'input': {'turns': total_turns, 'bytes': text_bytes},
+        'stages': {}
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        text_files = []
+        json_files = []
+        for index, text in enumerate(texts):
+            text_file = os.path.join(work_dir, f"transcript_{index}.txt")
+            with open(text_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            text_files.append(text_file)
+            json_files.append(process_file(text_file, output_path=os.path.join(work_dir, f"transcript_{index}.json"))[0])
+
+        parser = get_line_parser()
+
+        def loaded():
+            # Fresh transcripts, so no stage benefits from text or sentences cached by an earlier run
+            return [load_transcript(json_file) for json_file in json_files]
+
+        def sentiment(transcripts_to_score):
+            from sentiment_analyzer import analyze_sentiment
+            for transcript in transcripts_to_score:
+                analyze_sentiment(transcript)
+
+        def loaded_for_sentiment():
+            # Load VADER and Punkt before timing, as a warm worker would have them
+            from sentiment_analyzer import get_sentiment_analyzer
+            import nltk_resources
+            get_sentiment_analyzer()
+            nltk_resources.sentence_tokenizer()
+            return loaded()
+
+        def write_csv(rows):
+            with ResultCSVWriter(os.path.join(work_dir, "results.csv")) as writer:
+                for row in rows:
+                    writer.write(row)
+
+        def result_rows():
+            row = analyze_loaded_transcript(loaded()[0], "transcript_0.json")
+            return [dict(row, transcript_name=f"transcript_{index}.json") for index in range(transcripts)]
+
+        stage_runs = {
+            'parse': (lambda _: [list(parser.parse_buffer(text)) for text in texts], lambda: None),
+            'convert': (lambda _: [process_file(text_file, output_path=text_file + ".out.json") for text_file in text_files],
+                        lambda: None),
+            'load': (lambda _: loaded(), lambda: None),
+            # Scored without evidence, as the batch pipeline scores
+            'rubric': (lambda transcripts_to_score: [analyze_transcript(transcript, evidence=0)
+                                                     for transcript in transcripts_to_score],
+                       loaded),
+            'sentiment': (sentiment, loaded_for_sentiment),
+            'csv': (write_csv, result_rows),
+        }
+
+        for stage in stages:
+            run, setup = stage_runs[stage]
+            try:
+                times, peak = _measure(run, setup, repeat)
+            except Exception as e:
+                report['stages'][stage] = {'error': str(e)}
+                continue
+
+            best = min(times)
+            report['stages'][stage] = {
+                'seconds_best': best,
+                'seconds_median': statistics.median(times),
+                'turns_per_sec': total_turns / best if best else None,
+                'mb_per_sec': text_bytes / 1e6 / best if best else None,
+                'peak_memory_bytes': peak
+            }
+
+    return report
+
+
+def main():
+    """Main function to parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the transcript analysis stages on synthetic transcripts.')
+    parser.add_argument('--turns', type=int, default=200, help='Turns per transcript (default: 200)')
+    parser.add_argument('--words-per-turn', type=int, default=40, help='Average words per turn (default: 40)')
+    parser.add_argument('--keyword-density', type=float, default=0.05,
+                        help='Share of words that are rubric keywords (default: 0.05)')
+    parser.add_argument('--transcripts', type=int, default=20, help='Transcripts per measurement (default: 20)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per stage (default: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--stages', default=','.join(_STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(_STAGES)})")
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    log_config.add_arguments(parser)
+
+    args = parser.parse_args()
+    log_config.configure_from_args(args)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in _STAGES]
+    if unknown:
+        logger.error("Unknown stages: %s", ', '.join(unknown))
+        return 1
+    if args.turns < 1 or args.transcripts < 1 or args.repeat < 1:
+        logger.error("--turns, --transcripts and --repeat must be at least 1.")
+        return 1
+
+    report = run_benchmark(args.turns, args.words_per_turn, args.keyword_density,
+                           args.transcripts, args.repeat, args.seed, stages)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info("Benchmark report saved to %s", args.output)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,11 +9,88 @@ and combines the results into a single CSV file.
 import argparse
 import csv
 import json
+import logging
 import os
 import sys
-import traceback
-from sentiment_analyzer import analyze_sentiment, summarize_sentiment
-from transcript_analyzer import analyze_transcript
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from enum import Enum
+from itertools import islice
+import instrumentation
+import log_config
+import nltk_resources
+from corpus import index_path, interview_references, is_corpus, parse_reference, read_source
+from result_cache import ResultCache
+from transcript_analyzer import DEFAULT_RUBRIC, analyze_transcript
+from transcript import load_transcript
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to the analyzers changes results, to invalidate cached results
+ANALYZER_VERSION = "7"
+
+# Sentiment columns contributed by process_transcript for each speaker
+SENTIMENT_FIELDS = [
+    f"{speaker}_{field}"
+    for speaker in ('candidate', 'interviewer')
+    for field in ('sentiment', 'positive', 'negative', 'neutral', 'compound')
+]
+
+
+def score_field(criterion):
+    """Returns the CSV column name for a rubric criterion's score."""
+    return f"score_{criterion.replace(' ', '_').lower()}"
+
+
+def result_fieldnames(rubric=DEFAULT_RUBRIC):
+    """
+    Returns the CSV columns for combined results, known up front from the rubric and sentiment fields.
+    
+    Args:
+        rubric: The rubric the transcripts are scored against
+        
+    Returns:
+        Sorted list of column names
+    """
+    fieldnames = ['transcript_name', 'pass_fail'] + SENTIMENT_FIELDS
+    fieldnames.extend(score_field(criterion) for criterion in rubric.criterion_names)
+    return sorted(fieldnames)
+
+
+class ResultCSVWriter:
+    """
+    Writes combined results to a CSV file with a fixed schema, one row at a time.
+    
+    Each row is flushed as soon as it is written, so memory stays flat and the rows
+    already written survive if the run is interrupted.
+    """
+    
+    def __init__(self, output_file, fieldnames=None):
+        self.output_file = output_file
+        self.fieldnames = fieldnames or result_fieldnames()
+        self.rows_written = 0
+        self._csvfile = None
+        self._writer = None
+    
+    def __enter__(self):
+        self._csvfile = open(self.output_file, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._csvfile, fieldnames=self.fieldnames)
+        self._writer.writeheader()
+        self._csvfile.flush()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, tb):
+        self._csvfile.close()
+        return False
+    
+    def write(self, result):
+        """Writes one result row and flushes it to the file."""
+        with instrumentation.timer('write'):
+            self._writer.writerow(result)
+            self._csvfile.flush()
+        self.rows_written += 1
 
 def process_transcript(transcript_file, debug=False):
     """
@@ -21,48 +98,59 @@ def process_transcript(transcript_file, debug=False):
     
     Args:
         transcript_file: Path to the transcript file
-        debug: Whether to print debug information
+        debug: Whether to log tracebacks of errors
         
     Returns:
         Dictionary containing combined analysis results, or None if an error occurred
     """
     try:
-        print(f"Processing {transcript_file}...")
+        logger.info("Processing %s...", transcript_file)
         
-        # Check if input is a text file that needs conversion
-        if transcript_file.endswith('.txt'):
-            try:
-                # Import transcript converter
-                from transcript_converter import process_file
-                
-                # Convert text to JSON
-                print(f"Converting text transcript to JSON...")
-                json_file, _ = process_file(transcript_file)
-                print(f"Converted text transcript to JSON: {json_file}")
-                transcript_file = json_file
-            except Exception as e:
-                print(f"ERROR during transcript conversion: {str(e)}")
-                if debug:
-                    traceback.print_exc()
-                return None
+        # Read and parse the file once; text transcripts are converted in memory
+        try:
+            transcript = load_transcript(transcript_file)
+        except Exception as e:
+            logger.error("Error loading transcript %s: %s", transcript_file, e, exc_info=debug)
+            return None
         
-        # Get the transcript filename without extension for reporting
-        transcript_name = os.path.basename(transcript_file)
+        # Report the transcript under its file name
+        return analyze_loaded_transcript(transcript, os.path.basename(transcript_file), debug)
+    
+    except Exception as e:
+        logger.error("Error processing transcript %s: %s", transcript_file, e, exc_info=debug)
+        return None
+
+def analyze_loaded_transcript(transcript, transcript_name, debug=False):
+    """
+    Run both analyzers on an already loaded transcript.
+    
+    Args:
+        transcript: Loaded Transcript
+        transcript_name: Name reported in the 'transcript_name' column
+        debug: Whether to log tracebacks of errors
         
+    Returns:
+        Dictionary containing combined analysis results, or None if an error occurred
+    """
+    # Imported here so that runs served from the result cache never load NLTK
+    from sentiment_analyzer import analyze_sentiment, summarize_sentiment
+    
+    try:
         # Run sentiment analysis
-        print("Running sentiment analysis...")
-        sentiment_results = analyze_sentiment(transcript_file)
+        logger.debug("Running sentiment analysis on %s", transcript_name)
+        sentiment_results = analyze_sentiment(transcript)
         if not sentiment_results:
-            print("Sentiment analysis failed.")
+            logger.error("Sentiment analysis of %s failed.", transcript_name)
             return None
         
         sentiment_summary = summarize_sentiment(sentiment_results)
         
         # Run transcript analysis
-        print("Running transcript analysis...")
-        transcript_results = analyze_transcript(transcript_file)
+        logger.debug("Running transcript analysis on %s", transcript_name)
+        # The CSV holds scores only, so no evidence is collected
+        transcript_results = analyze_transcript(transcript, evidence=0)
         if "error" in transcript_results:
-            print(f"Transcript analysis failed: {transcript_results['error']}")
+            logger.error("Transcript analysis of %s failed: %s", transcript_name, transcript_results['error'])
             return None
         
         # Combine results
@@ -86,119 +174,366 @@ def process_transcript(transcript_file, debug=False):
         
         # Add transcript analysis scores
         for criterion, score in transcript_results['scores'].items():
-            combined_results[f"score_{criterion.replace(' ', '_').lower()}"] = score
+            combined_results[score_field(criterion)] = score
         
         return combined_results
     
     except Exception as e:
-        print(f"ERROR processing transcript: {str(e)}")
-        if debug:
-            traceback.print_exc()
+        logger.error("Error processing transcript %s: %s", transcript_name, e, exc_info=debug)
         return None
 
-def process_all_transcripts(transcripts_dir, output_file, debug=False):
+def _init_worker(metrics=False, log_settings=None):
+    """Builds the per-process analyzers once, when a pool worker starts."""
+    if log_settings:
+        log_config.configure(**log_settings)
+    if metrics:
+        # Start from empty metrics: a forked worker inherits what the parent has recorded so far
+        instrumentation.disable()
+        instrumentation.enable()
+    from sentiment_analyzer import get_sentiment_analyzer
+    get_sentiment_analyzer()
+
+
+def _process_in_worker(transcript_file, debug=False):
+    """Runs process_transcript in a pool worker and hands back the metrics it recorded."""
+    with instrumentation.timer('transcript'):
+        result = process_transcript(transcript_file, debug)
+    return result, instrumentation.collect()
+
+
+def cache_version(rubric=DEFAULT_RUBRIC):
+    """Returns the version string cached results are keyed on."""
+    return f"{ANALYZER_VERSION}:{rubric.fingerprint}"
+
+
+def _cache_lookup(cache, transcript_file):
+    """
+    Look up a transcript in the result cache.
+    
+    Returns:
+        Tuple of (key, result); result is None on a miss and key is None if the file can't be read
+    """
+    try:
+        key = cache.make_key(read_source(transcript_file), cache_version())
+    except OSError:
+        return None, None
+    
+    result = cache.get(key)
+    instrumentation.count('cache_misses' if result is None else 'cache_hits')
+    if result is not None:
+        logger.debug("Using cached result for %s", transcript_file)
+        # The same content may be cached under another file name
+        result['transcript_name'] = os.path.basename(transcript_file)
+    return key, result
+
+
+class _State(Enum):
+    """Where a file in iter_results' window of pending files stands."""
+    CACHED = 'cached'      # Its result came from the cache
+    LOCAL = 'local'        # Runs in this process when its turn comes, as there is no pool
+    RUNNING = 'running'    # Submitted to the pool; its future holds the result
+    DEFERRED = 'deferred'  # Waits to be submitted until the files suspected of killing a worker are done
+    SUSPECT = 'suspect'    # Was in flight when a worker died; rerun alone to find out whether it killed it
+
+
+@dataclass
+class _PendingFile:
+    """A transcript file in iter_results' window of pending files."""
+    file: str
+    key: str = None
+    result: dict = None
+    state: _State = _State.LOCAL
+    future: Future = None
+
+
+def iter_results(transcript_files, workers=1, debug=False, cache=None):
+    """
+    Process transcript files, optionally in a process pool, yielding results in input order.
+    
+    Args:
+        transcript_files: List of transcript file paths
+        workers: Number of worker processes (1 processes files in this process)
+        debug: Whether to log tracebacks of errors
+        cache: Optional ResultCache; cached files are not re-analyzed and new results are stored
+        
+    Yields:
+        Tuples of (transcript_file, result), where result is None if the file failed
+    """
+    def new_executor():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(instrumentation.is_enabled(), log_config.settings()))
+    
+    executor = new_executor() if workers > 1 else None
+    
+    def restart():
+        nonlocal executor
+        executor.shutdown(wait=False)
+        executor = new_executor()
+    
+    def start(entry):
+        # A pool broken by a worker that just died is noticed when the file in flight fails
+        try:
+            entry.future = executor.submit(_process_in_worker, entry.file, debug)
+            entry.state = _State.RUNNING
+        except BrokenProcessPool:
+            entry.state = _State.DEFERRED
+    
+    def submit(transcript_file, defer=False):
+        key, result = _cache_lookup(cache, transcript_file) if cache else (None, None)
+        entry = _PendingFile(transcript_file, key, result)
+        if result is not None:
+            entry.state = _State.CACHED
+        elif executor is None:
+            entry.state = _State.LOCAL
+        elif defer:
+            entry.state = _State.DEFERRED
+        else:
+            start(entry)
+        return entry
+    
+    def run_alone(transcript_file):
+        # Nothing else is in flight, so a worker dying now was killed by this file
+        try:
+            result, worker_metrics = executor.submit(_process_in_worker, transcript_file, debug).result()
+            instrumentation.merge(worker_metrics)
+            return result
+        except BrokenProcessPool:
+            logger.error("Error processing %s: the worker process died", transcript_file)
+            restart()
+        except Exception as e:
+            logger.error("Error processing %s: %s", transcript_file, e, exc_info=debug)
+        return None
+    
+    try:
+        # Keep a bounded window of files in flight so results can be consumed as they finish
+        max_pending = workers * 4
+        files = iter(transcript_files)
+        pending = deque(submit(transcript_file) for transcript_file in islice(files, max_pending))
+        
+        while pending:
+            entry = pending.popleft()
+            if entry.state is _State.SUSPECT:
+                entry.result = run_alone(entry.file)
+            elif entry.state is not _State.CACHED:
+                if entry.state is _State.DEFERRED:
+                    # The suspects are done, so everything that waited can run side by side again
+                    for waiting in [entry, *pending]:
+                        if waiting.state is _State.DEFERRED:
+                            start(waiting)
+                try:
+                    if entry.state is _State.LOCAL:
+                        with instrumentation.timer('transcript'):
+                            entry.result = process_transcript(entry.file, debug)
+                    elif entry.state is _State.DEFERRED:
+                        # The pool broke again before the file could be submitted
+                        raise BrokenProcessPool()
+                    else:
+                        entry.result, worker_metrics = entry.future.result()
+                        instrumentation.merge(worker_metrics)
+                except BrokenProcessPool:
+                    # A worker died, which fails every file in flight. Restart the pool and rerun
+                    # those files one at a time, so only the file that kills a worker is lost.
+                    restart()
+                    for waiting in pending:
+                        if waiting.state in (_State.RUNNING, _State.DEFERRED):
+                            waiting.state = _State.SUSPECT
+                            waiting.future = None
+                    entry.result = run_alone(entry.file)
+                except Exception as e:
+                    logger.error("Error processing %s: %s", entry.file, e, exc_info=debug)
+                    entry.result = None
+            
+            if cache and entry.key and entry.result and entry.state is not _State.CACHED:
+                cache.put(entry.key, entry.result)
+            
+            instrumentation.count('transcripts_succeeded' if entry.result else 'transcripts_failed')
+            yield entry.file, entry.result
+            
+            next_file = next(files, None)
+            if next_file is not None:
+                suspects = any(waiting.state is _State.SUSPECT for waiting in pending)
+                pending.append(submit(next_file, defer=suspects))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def process_all_transcripts(transcripts_dir, output_file, debug=False, workers=1, cache=None):
     """
     Process all transcript files in the specified directory and save results to CSV.
     
     Args:
         transcripts_dir: Directory containing transcript files
         output_file: Path to the output CSV file
-        debug: Whether to print debug information
+        debug: Whether to log tracebacks of errors
+        workers: Number of worker processes to analyze transcripts with
+        cache: Optional ResultCache for results of unchanged transcripts
     """
     # Ensure the transcripts directory exists
     if not os.path.exists(transcripts_dir):
-        print(f"ERROR: Transcripts directory '{transcripts_dir}' not found.")
+        logger.error("Transcripts directory '%s' not found.", transcripts_dir)
         return 1
     
-    # Get all transcript files in the directory
+    # Get all transcript files in the directory, in a stable order
     transcript_files = []
-    for f in os.listdir(transcripts_dir):
+    for f in sorted(os.listdir(transcripts_dir)):
         file_path = os.path.join(transcripts_dir, f)
-        if os.path.isfile(file_path) and (f.endswith('.txt') or f.endswith('.json')):
-            transcript_files.append(file_path)
+        if os.path.isfile(file_path) and f.endswith(('.txt', '.json', '.jsonl')):
+            if os.path.isfile(index_path(file_path)):
+                # An indexed corpus contributes each of its interviews
+                try:
+                    transcript_files.extend(interview_references(file_path))
+                except (OSError, ValueError) as e:
+                    logger.error("Skipping corpus %s: %s", file_path, e)
+            elif is_corpus(file_path):
+                # Scoring it as one transcript would merge all of its interviews
+                logger.error("Skipping corpus %s: it has no index. Build it with 'corpus.py index'.", file_path)
+            else:
+                transcript_files.append(file_path)
     
     if not transcript_files:
-        print(f"No transcript files found in '{transcripts_dir}'.")
+        logger.error("No transcript files found in '%s'.", transcripts_dir)
         return 1
     
-    results = []
+    return write_results(transcript_files, output_file, debug, workers, cache)
+
+def process_corpus(corpus_path, output_file, debug=False, workers=1, cache=None):
+    """
+    Process every interview of a corpus and save results to CSV.
     
-    # Process each transcript file
-    for transcript_file in transcript_files:
-        result = process_transcript(transcript_file, debug)
-        if result:
-            results.append(result)
-    
-    # Write results to CSV
-    if results:
-        # Get all unique keys from all result dictionaries to use as CSV headers
-        fieldnames = set()
-        for result in results:
-            fieldnames.update(result.keys())
-        fieldnames = sorted(list(fieldnames))
+    Args:
+        corpus_path: Path to an indexed corpus file
+        output_file: Path to the output CSV file
+        debug: Whether to log tracebacks of errors
+        workers: Number of worker processes to analyze interviews with
+        cache: Optional ResultCache for results of unchanged interviews
+    """
+    try:
+        transcript_files = interview_references(corpus_path)
+    except (OSError, ValueError) as e:
+        logger.error("Error opening corpus: %s", e)
+        return 1
+    
+    if not transcript_files:
+        logger.error("No interviews found in corpus '%s'.", corpus_path)
+        return 1
+    
+    return write_results(transcript_files, output_file, debug, workers, cache)
+
+def write_results(transcript_files, output_file, debug=False, workers=1, cache=None):
+    """
+    Analyze transcripts and write their results to CSV as they finish.
+    
+    Args:
+        transcript_files: Transcript file paths or corpus references
+        output_file: Path to the output CSV file
+        debug: Whether to log tracebacks of errors
+        workers: Number of worker processes
+        cache: Optional ResultCache
+    """
+    # Write each result as soon as its transcript finishes
+    try:
+        with ResultCSVWriter(output_file) as writer:
+            for transcript_file, result in iter_results(transcript_files, workers, debug, cache):
+                if result:
+                    writer.write(result)
+    except Exception as e:
+        logger.error("Error writing to CSV: %s", e, exc_info=debug)
+        return 1
+    
+    if writer.rows_written:
+        logger.info("Analysis complete. %d results saved to %s", writer.rows_written, output_file)
+        return 0
+    else:
+        logger.error("No results to write to CSV.")
+        return 1
+
+def process_single_transcript(transcript_file, output_file, debug=False, cache=None):
+    """
+    Process one transcript file (or corpus reference) and save its result to CSV.
+    
+    Args:
+        transcript_file: Path to the transcript file
+        output_file: Path to the output CSV file
+        debug: Whether to log tracebacks of errors
+        cache: Optional ResultCache
+    """
+    if not os.path.isfile(transcript_file) and parse_reference(transcript_file) is None:
+        logger.error("File '%s' not found.", transcript_file)
+        return 1
         
+    _, result = next(iter_results([transcript_file], 1, debug, cache))
+    
+    if result:
+        # Write single result to CSV
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(results)
+            with ResultCSVWriter(output_file) as writer:
+                writer.write(result)
             
-            print(f"Analysis complete. Results saved to {output_file}")
+            logger.info("Analysis complete. Results saved to %s", output_file)
             return 0
         except Exception as e:
-            print(f"ERROR writing to CSV: {str(e)}")
-            if debug:
-                traceback.print_exc()
+            logger.error("Error writing to CSV: %s", e, exc_info=debug)
             return 1
     else:
-        print("No results to write to CSV.")
+        logger.error("Analysis failed. No results to write.")
         return 1
 
 def main():
     """Main function to parse arguments and run the pipeline."""
     parser = argparse.ArgumentParser(description='Process transcript files and generate combined analysis CSV.')
     parser.add_argument('--dir', help='Directory containing transcript files')
-    parser.add_argument('--file', help='Process a single transcript file')
+    parser.add_argument('--file', help='Process a single transcript file (or a corpus reference, corpus.jsonl#id)')
+    parser.add_argument('--corpus', help='Process every interview of an indexed corpus file')
     parser.add_argument('--output', default='combined_analysis_results.csv',
                         help='Output CSV file path (default: combined_analysis_results.csv)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes for --dir (default: 1)')
+    parser.add_argument('--cache-dir', help='Directory for cached results of unchanged transcripts (default: no cache)')
+    parser.add_argument('--cache-max-mb', type=int, default=512,
+                        help='Maximum size of the result cache in MB (default: 512)')
+    parser.add_argument('--nltk-data', help='Local NLTK data directory with vader_lexicon and punkt')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Record per-stage timings and counters, print a summary and save them as JSON to FILE')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode for more detailed output')
+    log_config.add_arguments(parser)
     
     args = parser.parse_args()
+    log_config.configure_from_args(args)
+    
+    if args.nltk_data:
+        nltk_resources.set_data_dir(args.nltk_data)
     
-    if not args.dir and not args.file:
-        print("ERROR: Either --dir or --file must be specified.")
+    if not args.dir and not args.file and not args.corpus:
+        logger.error("One of --dir, --file or --corpus must be specified.")
         return 1
     
+    if args.workers < 1:
+        logger.error("--workers must be at least 1.")
+        return 1
+    
+    cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    
+    if args.metrics:
+        instrumentation.enable()
+    
     if args.file:
         # Process a single file
-        if not os.path.isfile(args.file):
-            print(f"ERROR: File '{args.file}' not found.")
-            return 1
-            
-        result = process_transcript(args.file, args.debug)
-        
-        if result:
-            # Write single result to CSV
-            try:
-                with open(args.output, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = sorted(list(result.keys()))
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerow(result)
-                
-                print(f"Analysis complete. Results saved to {args.output}")
-                return 0
-            except Exception as e:
-                print(f"ERROR writing to CSV: {str(e)}")
-                if args.debug:
-                    traceback.print_exc()
-                return 1
-        else:
-            print("Analysis failed. No results to write.")
-            return 1
+        status = process_single_transcript(args.file, args.output, args.debug, cache)
+    elif args.corpus:
+        # Process every interview in the corpus
+        status = process_corpus(args.corpus, args.output, args.debug, args.workers, cache)
     else:
         # Process all files in the directory
-        return process_all_transcripts(args.dir, args.output, args.debug)
+        status = process_all_transcripts(args.dir, args.output, args.debug, args.workers, cache)
+    
+    if args.metrics:
+        print("\nStage metrics:")
+        print(instrumentation.get_metrics().summary_table())
+        instrumentation.write_json(args.metrics)
+        logger.info("Metrics saved to %s", args.metrics)
+    
+    log_config.report_suppressed(logger)
+    return status
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
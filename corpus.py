@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Transcript Corpus
+
+A corpus stores many interviews in one JSON Lines file. Each interview is a header
+record followed by one record per turn:
+
+    {"interview_id": "interview_1", "source": "interview_1.json", "turn_count": 2, "interview": {"date": ..., "candidate": ...}}
+    {"speaker": "Interviewer", "time": "0:00", "dialogue": "..."}
+    {"speaker": "Candidate", "time": "0:05", "dialogue": "..."}
+
+A sidecar index (<corpus>.idx, JSON) records the byte offset of every header and turn
+record, the speaker of every turn, and the byte span of each plain-ASCII dialogue
+string inside its record.
+CorpusReader memory-maps the corpus and uses the index to seek straight to an
+interview or to a single turn, so listing candidates or dates only decodes header
+records and never parses dialogue text. Keyword scoring reads the dialogue spans as
+memoryview slices, and the speakers from the index, without decoding them; turns are
+decoded to str only when sentiment scoring needs them.
+
+An interview in a corpus is referenced as "<corpus path>#<interview id>"; such
+references can be passed to load_transcript() and to the analysis pipeline like file paths.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import re
+
+import log_config
+from token_index import build_indexes
+from transcript import Transcript, load_transcript, resolve_role
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.idx'
+INDEX_FORMAT = 3
+
+# Header records are written with this key first, so they are recognized without parsing
+_HEADER_PREFIX = b'{"interview_id":'
+
+_DIALOGUE_KEY = re.compile(rb'"dialogue"\s*:\s*')
+
+_open_readers = {}
+
+
+def index_path(corpus_path):
+    """Returns the path of a corpus's sidecar index."""
+    return corpus_path + INDEX_SUFFIX
+
+
+def is_corpus(path):
+    """
+    Tells whether a file is a corpus, by the header record it starts with, whether or not
+    it has been indexed.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(_HEADER_PREFIX)) == _HEADER_PREFIX
+    except OSError:
+        return False
+
+
+def _dialogue_span(record, turn):
+    """
+    Finds the bytes of a turn's dialogue string inside its encoded record.
+
+    Only dialogue that is ASCII without JSON escapes gets a span, since its raw bytes are
+    then exactly its text; other turns are decoded when their dialogue is needed.
+
+    Returns:
+        list: [start, end] relative to the record, or None.
+    """
+    dialogue = turn.get('dialogue') if isinstance(turn, dict) else None
+    if not isinstance(dialogue, str) or not dialogue.isascii():
+        return None
+    encoded = json.dumps(dialogue).encode('ascii')
+    if len(encoded) != len(dialogue) + 2:
+        return None
+
+    # An unescaped '"dialogue":' can only be a key; give up if a nested one is ambiguous
+    spans = [[key.end() + 1, key.end() + len(encoded) - 1]
+             for key in _DIALOGUE_KEY.finditer(record) if record.startswith(encoded, key.end())]
+    return spans[0] if len(spans) == 1 else None
+
+
+def _write_index(corpus_path, interviews, corpus_size):
+    index = {
+        'format': INDEX_FORMAT,
+        'corpus_size': corpus_size,
+        'interviews': interviews
+    }
+    tmp_path = index_path(corpus_path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, index_path(corpus_path))
+
+
+def write_corpus(corpus_path, transcripts):
+    """
+    Writes interviews to a corpus file and its index.
+
+    Args:
+        corpus_path (str): Path of the corpus file to write (conventionally .jsonl).
+        transcripts (iterable): Pairs of (interview_id, Transcript).
+
+    Returns:
+        int: The number of interviews written.
+
+    Raises:
+        ValueError: If an interview id is repeated.
+    """
+    interviews = []
+    seen = set()
+    offset = 0
+
+    with open(corpus_path, 'wb') as f:
+        for interview_id, transcript in transcripts:
+            if interview_id in seen:
+                raise ValueError(f"Duplicate interview id '{interview_id}' in corpus.")
+            seen.add(interview_id)
+
+            header = {
+                'interview_id': interview_id,
+                'source': os.path.basename(transcript.source) if transcript.source else None,
+                'turn_count': len(transcript.turns),
+                'interview': transcript.metadata
+            }
+            entry = {'id': interview_id, 'offset': offset, 'turn_offsets': [], 'turn_speakers': [], 'dialogue_spans': []}
+
+            line = (json.dumps(header, ensure_ascii=False) + '\n').encode('utf-8')
+            f.write(line)
+            offset += len(line)
+
+            for turn in transcript.turns:
+                line = (json.dumps(turn, ensure_ascii=False) + '\n').encode('utf-8')
+                _add_turn(entry, offset, line, turn)
+                f.write(line)
+                offset += len(line)
+
+            entry['end'] = offset
+            interviews.append(entry)
+
+    _write_index(corpus_path, interviews, offset)
+    return len(interviews)
+
+
+def _add_turn(entry, offset, record, turn):
+    entry['turn_offsets'].append(offset)
+    entry['turn_speakers'].append(turn.get('speaker') if isinstance(turn, dict) else None)
+    span = _dialogue_span(record, turn)
+    entry['dialogue_spans'].append([offset + span[0], offset + span[1]] if span else None)
+
+
+def rebuild_index(corpus_path):
+    """
+    Rebuilds the index of a corpus file by scanning its records.
+
+    Args:
+        corpus_path (str): Path of the corpus file.
+
+    Returns:
+        int: The number of interviews indexed.
+    """
+    interviews = []
+    offset = 0
+    with open(corpus_path, 'rb') as f:
+        for line in f:
+            if line.startswith(_HEADER_PREFIX):
+                if interviews:
+                    interviews[-1]['end'] = offset
+                header = json.loads(line)
+                interviews.append({'id': header['interview_id'], 'offset': offset, 'turn_offsets': [],
+                                   'turn_speakers': [], 'dialogue_spans': []})
+            elif line.strip() and interviews:
+                _add_turn(interviews[-1], offset, line, json.loads(line))
+            offset += len(line)
+
+    if interviews:
+        interviews[-1]['end'] = offset
+    _write_index(corpus_path, interviews, offset)
+    return len(interviews)
+
+
+class CorpusReader:
+    """
+    Random access to the interviews of a corpus through its index and a memory map.
+    """
+
+    def __init__(self, corpus_path):
+        """
+        Args:
+            corpus_path (str): Path of the corpus file. Its index must exist.
+
+        Raises:
+            FileNotFoundError: If the corpus or its index is missing.
+            ValueError: If the index does not match the corpus.
+        """
+        self.path = corpus_path
+        with open(index_path(corpus_path), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+        self._file = open(corpus_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if index.get('format') != INDEX_FORMAT or index.get('corpus_size') != size:
+            self._file.close()
+            raise ValueError(f"The index of corpus '{corpus_path}' is out of date. Rebuild it with 'corpus.py index'.")
+
+        # mmap cannot map an empty file
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._interviews = {entry['id']: entry for entry in index['interviews']}
+        self.interview_ids = [entry['id'] for entry in index['interviews']]
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.interview_ids)
+
+    def __contains__(self, interview_id):
+        return interview_id in self._interviews
+
+    def _entry(self, interview_id):
+        try:
+            return self._interviews[interview_id]
+        except KeyError:
+            raise KeyError(f"Interview '{interview_id}' not found in corpus '{self.path}'.")
+
+    def header(self, interview_id):
+        """Returns the header record of an interview, decoding nothing else."""
+        entry = self._entry(interview_id)
+        end = entry['turn_offsets'][0] if entry['turn_offsets'] else entry['end']
+        return json.loads(self._data[entry['offset']:end])
+
+    def metadata(self, interview_id):
+        """Returns the interview-level fields (date, candidate, position, ...) of an interview."""
+        return self.header(interview_id)['interview']
+
+    def iter_metadata(self):
+        """
+        Yields (interview_id, metadata) for every interview in corpus order, without reading any turns.
+        """
+        for interview_id in self.interview_ids:
+            yield interview_id, self.metadata(interview_id)
+
+    def turn_count(self, interview_id):
+        return len(self._entry(interview_id)['turn_offsets'])
+
+    def speakers(self, interview_id):
+        """Returns the speaker of each turn of an interview (None where a turn has none), from the index."""
+        return self._entry(interview_id)['turn_speakers']
+
+    @staticmethod
+    def _turn_end(entry, turn_index):
+        # A turn record ends where the next one starts, or at the end of the interview
+        offsets = entry['turn_offsets']
+        return offsets[turn_index + 1] if turn_index + 1 < len(offsets) else entry['end']
+
+    def turn(self, interview_id, turn_index):
+        """Returns one turn of an interview, reading only that record."""
+        entry = self._entry(interview_id)
+        turn_index = range(len(entry['turn_offsets']))[turn_index]
+        return json.loads(self._data[entry['turn_offsets'][turn_index]:self._turn_end(entry, turn_index)])
+
+    def turns(self, interview_id, start=0, stop=None):
+        """
+        Returns a range of turns of an interview with a single read.
+
+        Args:
+            interview_id (str): The interview.
+            start (int): Index of the first turn.
+            stop (int, optional): Index after the last turn (default: all remaining turns).
+
+        Returns:
+            list: The turn dictionaries.
+        """
+        entry = self._entry(interview_id)
+        indices = range(len(entry['turn_offsets']))[start:stop]
+        if not indices:
+            return []
+        data = self._data[entry['turn_offsets'][indices[0]]:self._turn_end(entry, indices[-1])]
+        return [json.loads(line) for line in data.splitlines()]
+
+    def dialogue_segments(self, interview_id):
+        """
+        Returns the lowercased dialogue of each turn as bytes-like segments for keyword scanning.
+
+        The interview's records are lowercased once and the dialogue spans are handed out
+        as zero-copy memoryview slices of that buffer; only turns whose dialogue is not
+        plain ASCII are decoded, and are handed out as lowercased str.
+
+        Returns:
+            list: One lowercased segment per turn, as taken by token_index.segment_tokens().
+        """
+        entry = self._entry(interview_id)
+        base = entry['offset']
+        lowered = memoryview(self._data[base:entry['end']].lower())
+
+        segments = []
+        for turn_index, span in enumerate(entry['dialogue_spans']):
+            if span is not None:
+                segments.append(lowered[span[0] - base:span[1] - base])
+                continue
+            turn = self.turn(interview_id, turn_index)
+            dialogue = turn.get('dialogue', '') if isinstance(turn, dict) else ''
+            segments.append(dialogue.lower() if isinstance(dialogue, str) else '')
+        return segments
+
+    def raw(self, interview_id):
+        """Returns the bytes of an interview's records, e.g. to key cached results on."""
+        entry = self._entry(interview_id)
+        return self._data[entry['offset']:entry['end']]
+
+    def load(self, interview_id):
+        """
+        Loads an interview as a Transcript.
+
+        Returns:
+            CorpusTranscript: The interview, with its corpus reference as the source.
+        """
+        return CorpusTranscript(self, interview_id, self.metadata(interview_id))
+
+
+class CorpusTranscript(Transcript):
+    """
+    A Transcript of a corpus interview whose turns are decoded on first use.
+
+    Keyword scoring reads dialogue_segments() straight from the memory-mapped corpus;
+    the turns, speakers and dialogue strings are only decoded when something, such
+    as sentiment scoring, accesses them.
+    """
+
+    def __init__(self, reader, interview_id, metadata):
+        self.metadata = metadata or {}
+        self.source = f"{reader.path}#{interview_id}"
+        self.reader = reader
+        self.interview_id = interview_id
+        self._roles = None
+
+    def __getattr__(self, name):
+        # Called only for attributes not set yet: decode the turns, which sets them all
+        if name in ('turns', 'speakers', 'times', 'dialogues', '_token_indexes', '_normalized_sentences'):
+            Transcript.__init__(self, self.reader.turns(self.interview_id), self.metadata, self.source)
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    @property
+    def turn_count(self):
+        return self.reader.turn_count(self.interview_id)
+
+    @property
+    def roles(self):
+        """The role of each turn's speaker, resolved from the speakers in the index without decoding the turns."""
+        if self._roles is None:
+            candidate = self.candidate
+            interviewer = self.interviewer
+            self._roles = [resolve_role(speaker, candidate, interviewer)
+                           for speaker in self.reader.speakers(self.interview_id)]
+        return self._roles
+
+    def turn(self, turn_index):
+        """Returns one turn as a dictionary, reading only that record unless all turns are decoded already."""
+        if 'turns' in vars(self):
+            return super().turn(turn_index)
+        turn = self.reader.turn(self.interview_id, turn_index)
+        return turn if isinstance(turn, dict) else {}
+
+    def dialogue_segments(self):
+        """Returns the lowercased dialogue of each turn as bytes-like segments, without decoding."""
+        return self.reader.dialogue_segments(self.interview_id)
+
+    def segment_indexes(self):
+        """
+        Returns token indexes of the dialogue of all speakers and of each role, as
+        Transcript.token_indexes() does, built from the dialogue segments without decoding.
+        Tokens are bytes.
+        """
+        return build_indexes(self.dialogue_segments(), self.roles, binary=True)
+
+
+def open_corpus(corpus_path):
+    """
+    Returns a CorpusReader for a corpus, reusing the one already open in this process
+    unless the corpus or its index has changed since.
+    """
+    stamp = (os.path.getmtime(corpus_path), os.path.getmtime(index_path(corpus_path)))
+    cached = _open_readers.get(corpus_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    if cached:
+        cached[1].close()
+
+    reader = CorpusReader(corpus_path)
+    _open_readers[corpus_path] = (stamp, reader)
+    return reader
+
+
+def parse_reference(reference):
+    """
+    Splits an interview reference "<corpus path>#<interview id>".
+
+    Returns:
+        tuple: (corpus_path, interview_id), or None if the string is not a reference to an indexed corpus.
+    """
+    corpus_path, sep, interview_id = reference.rpartition('#')
+    if not sep or not interview_id or not os.path.isfile(index_path(corpus_path)):
+        return None
+    return corpus_path, interview_id
+
+
+def load_interview(reference):
+    """
+    Loads an interview from a corpus reference.
+
+    Raises:
+        FileNotFoundError: If the reference does not name an indexed corpus or the interview is not in it.
+    """
+    parsed = parse_reference(reference)
+    if parsed is None:
+        raise FileNotFoundError(f"No indexed corpus for '{reference}'.")
+    corpus_path, interview_id = parsed
+    reader = open_corpus(corpus_path)
+    if interview_id not in reader:
+        raise FileNotFoundError(f"Interview '{interview_id}' not found in corpus '{corpus_path}'.")
+    return reader.load(interview_id)
+
+
+def interview_references(corpus_path):
+    """Returns the references of every interview in a corpus, in corpus order."""
+    return [f"{corpus_path}#{interview_id}" for interview_id in open_corpus(corpus_path).interview_ids]
+
+
+def read_source(source):
+    """
+    Returns the raw bytes of a transcript file or of an interview in a corpus.
+    """
+    if not os.path.isfile(source):
+        parsed = parse_reference(source)
+        if parsed is not None:
+            reader = open_corpus(parsed[0])
+            if parsed[1] in reader:
+                return bytes(reader.raw(parsed[1]))
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _interview_id(transcript_file, seen):
+    base = os.path.splitext(os.path.basename(transcript_file))[0]
+    interview_id = base
+    suffix = 2
+    while interview_id in seen:
+        interview_id = f"{base}_{suffix}"
+        suffix += 1
+    seen.add(interview_id)
+    return interview_id
+
+
+def build_corpus(transcript_files, corpus_path):
+    """
+    Builds a corpus from transcript files (.json, .jsonl or .txt).
+
+    Files that cannot be loaded are reported and skipped. Interview ids are the file
+    names without extension, made unique with a numeric suffix.
+
+    Args:
+        transcript_files (list): Paths of the transcript files.
+        corpus_path (str): Path of the corpus file to write.
+
+    Returns:
+        int: The number of interviews written.
+    """
+    def transcripts():
+        seen = set()
+        for transcript_file in transcript_files:
+            try:
+                transcript = load_transcript(transcript_file)
+            except Exception as e:
+                logger.warning("Skipping %s: %s", transcript_file, e)
+                continue
+            yield _interview_id(transcript_file, seen), transcript
+
+    return write_corpus(corpus_path, transcripts())
+
+
+def main():
+    """Main function to parse arguments and build, index or list a corpus."""
+    parser = argparse.ArgumentParser(description='Build and inspect transcript corpora.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build a corpus from transcript files or directories')
+    build_parser.add_argument('inputs', nargs='+', help='Transcript files or directories')
+    build_parser.add_argument('-o', '--output', required=True, help='Corpus file to write (.jsonl)')
+
+    index_parser = subparsers.add_parser('index', help='Rebuild the index of a corpus')
+    index_parser.add_argument('corpus', help='Corpus file')
+
+    list_parser = subparsers.add_parser('list', help='List the interviews in a corpus')
+    list_parser.add_argument('corpus', help='Corpus file')
+    log_config.add_arguments(parser)
+
+    args = parser.parse_args()
+    log_config.configure_from_args(args)
+
+    if args.command == 'build':
+        transcript_files = []
+        for path in args.inputs:
+            if os.path.isdir(path):
+                transcript_files.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                                        if f.endswith(('.txt', '.json', '.jsonl')))
+            else:
+                transcript_files.append(path)
+        count = build_corpus(transcript_files, args.output)
+        logger.info("Wrote %d interviews to %s (index: %s)", count, args.output, index_path(args.output))
+
+    elif args.command == 'index':
+        count = rebuild_index(args.corpus)
+        logger.info("Indexed %d interviews in %s", count, args.corpus)
+
+    elif args.command == 'list':
+        with CorpusReader(args.corpus) as reader:
+            for interview_id, metadata in reader.iter_metadata():
+                print(f"{interview_id}\t{metadata.get('date', '')}\t{metadata.get('candidate', '')}\t{metadata.get('position', '')}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
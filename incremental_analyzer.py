@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Incremental Analyzer
+
+Keeps the rubric and sentiment analysis of a live interview up to date as new turns
+are transcribed, instead of re-analyzing the whole transcript after every chunk.
+
+Rubric scoring keeps running keyword counters for the whole dialogue and for each
+speaker that a rubric criterion is scoped to. The text of each is the dialogue of its
+turns followed by a space, so each delta is scanned together with the last few
+tokens of the text before it (one less than the longest phrase); only keywords that
+end inside the delta are counted, so a phrase like "time complexity" split across
+two chunks is found exactly once.
+
+Sentiment keeps a sum, a count and a sum of squares of each score per speaker, so
+the averages (and their spread) are updated from the new sentences only.
+
+Both updates are O(size of the delta), and the results equal those of
+analyze_transcript (without evidence) and analyze_sentiment on the full transcript.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+
+import log_config
+from sentiment_analyzer import SCORE_FIELDS, SPEAKER_IDS, score_batch
+from text_normalization import normalize_utterance
+from token_index import count_words
+from transcript import resolve_role
+from transcript_analyzer import default_evaluator
+from rubric import RubricEvaluator
+
+logger = logging.getLogger(__name__)
+
+# Names of the score fields in sentiment results
+_RESULT_FIELDS = {'compound': 'compound', 'pos': 'positive', 'neg': 'negative', 'neu': 'neutral'}
+
+
+class SpeakerSentiment:
+    """Running sentence score statistics for one speaker."""
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {field: 0.0 for field in SCORE_FIELDS}
+        self.sums_of_squares = {field: 0.0 for field in SCORE_FIELDS}
+
+    def add(self, scores, start, stop):
+        """Adds the sentence scores in rows [start, stop) of columnar scores from score_batch()."""
+        self.count += stop - start
+        for field in SCORE_FIELDS:
+            column = scores[field]
+            total = self.sums[field]
+            squares = self.sums_of_squares[field]
+            for index in range(start, stop):
+                value = column[index]
+                total += value
+                squares += value * value
+            self.sums[field] = total
+            self.sums_of_squares[field] = squares
+
+    def averages(self):
+        """Returns the average scores, as analyze_sentiment does, or None if there are no sentences."""
+        if not self.count:
+            return None
+        return {_RESULT_FIELDS[field]: self.sums[field] / self.count for field in SCORE_FIELDS}
+
+    def stats(self):
+        """Returns the sentence count and the mean and standard deviation of each score."""
+        stats = {'sentences': self.count}
+        for field in SCORE_FIELDS:
+            if not self.count:
+                stats[_RESULT_FIELDS[field]] = None
+                continue
+            mean = self.sums[field] / self.count
+            variance = max(self.sums_of_squares[field] / self.count - mean * mean, 0.0)
+            stats[_RESULT_FIELDS[field]] = {'mean': mean, 'std': math.sqrt(variance)}
+        return stats
+
+
+class IncrementalAnalyzer:
+    """
+    Rubric and sentiment analysis of a transcript that grows turn by turn.
+    """
+
+    def __init__(self, metadata=None, rubric=None, sentiment=True):
+        """
+        Args:
+            metadata (dict, optional): Interview fields; 'candidate' and 'interviewer' name the speakers.
+            rubric (Rubric, optional): Rubric to score against. Defaults to rubrics/default.json.
+            sentiment (bool): Whether to keep sentiment statistics (requires the VADER lexicon).
+        """
+        self.metadata = metadata or {}
+        self.evaluator = default_evaluator() if rubric is None else RubricEvaluator([rubric])
+        self.track_sentiment = sentiment
+
+        self.turn_count = 0
+        # Per scope of the rubric criteria (None for all dialogue, or a speaker role). All
+        # dialogue is always counted, for transcripts without any turn of a known speaker.
+        self._scopes = tuple(dict.fromkeys((None,) + self.evaluator.scopes))
+        self.keyword_counts = {scope: Counter() for scope in self._scopes}
+        self.word_counts = {scope: 0 for scope in self._scopes}
+        self._tails = {scope: "" for scope in self._scopes}
+        self.attributed = False
+
+        self.candidate = self.metadata.get('candidate', 'Candidate')
+        self.interviewer = self.metadata.get('interviewer', 'Interviewer')
+        self.speakers = {role: SpeakerSentiment() for role in SPEAKER_IDS}
+        self.skipped_turns = 0
+
+    def add_turns(self, turns):
+        """
+        Updates the analysis with newly transcribed turns.
+
+        Args:
+            turns (list): Turn dictionaries with 'speaker', 'time' and 'dialogue', in order.
+        """
+        turns = list(turns)
+        if not turns:
+            return
+        self.turn_count += len(turns)
+
+        roles = [resolve_role(turn.get('speaker'), self.candidate, self.interviewer) if isinstance(turn, dict) else None
+                 for turn in turns]
+        dialogues = [turn.get('dialogue', '') if isinstance(turn, dict) else '' for turn in turns]
+        self.attributed = self.attributed or any(role is not None for role in roles)
+        for scope in self._scopes:
+            self._add_text(scope, "".join(dialogue + " " for dialogue, role in zip(dialogues, roles)
+                                          if scope is None or role == scope).lower())
+
+        if self.track_sentiment:
+            self._add_sentiment(turns, roles)
+
+    def _add_text(self, scope, delta):
+        if not delta:
+            return
+        # Rescan the end of the previous text so that keywords spanning the seam are found
+        tail = self._tails[scope]
+        text = tail + delta
+        self.word_counts[scope] += count_words(delta)
+        self.keyword_counts[scope].update(self.evaluator.matcher.scan(text, lowered=True, skip=len(tail)))
+        self._tails[scope] = self.evaluator.matcher.tail(text)
+
+    def _add_sentiment(self, turns, roles):
+        sentences = []
+        speaker_rows = []
+        for turn, role in zip(turns, roles):
+            if not isinstance(turn, dict) or 'speaker' not in turn or 'dialogue' not in turn:
+                self.skipped_turns += 1
+                continue
+            if role is None:
+                self.skipped_turns += 1
+                continue
+            start = len(sentences)
+            sentences.extend(normalize_utterance(turn['dialogue']))
+            speaker_rows.append((role, start, len(sentences)))
+
+        if not sentences:
+            return
+        scores = score_batch(sentences)
+        for role, start, stop in speaker_rows:
+            self.speakers[role].add(scores, start, stop)
+
+    def result(self):
+        """
+        Returns the rubric analysis of the transcript so far.
+
+        Returns:
+            dict: The same result analyze_transcript would give for the full transcript, without evidence.
+        """
+        if not self.turn_count:
+            return {"error": "No transcript text found in the JSON file."}
+        # Without any turn of a known speaker, every criterion counts all dialogue
+        return self.evaluator.evaluate_scopes({
+            scope: (self.keyword_counts[scope if self.attributed else None],
+                    self.word_counts[scope if self.attributed else None])
+            for scope in self.evaluator.scopes
+        })[0]
+
+    def sentiment(self):
+        """
+        Returns the average sentiment per speaker so far.
+
+        Returns:
+            dict: The same result analyze_sentiment would give for the full transcript, or None without turns.
+        """
+        if not self.turn_count:
+            return None
+        return {role: stats.averages() for role, stats in self.speakers.items()}
+
+    def sentiment_stats(self):
+        """Returns the sentence count and the mean and standard deviation of each score per speaker."""
+        return {role: stats.stats() for role, stats in self.speakers.items()}
+
+
+def _read_new_turns(f, parser, segmenter=None):
+    # Only complete lines are consumed; a partial last line is re-read on the next poll
+    turns = []
+    while True:
+        position = f.tell()
+        line = f.readline()
+        if not line.endswith('\n'):
+            f.seek(position)
+            # Unlabeled blocks get their speakers as parse_text_file would assign them
+            return list(segmenter.assign(turns)) if segmenter is not None else turns
+        if parser is None:
+            if line.strip():
+                turns.append(json.loads(line))
+            continue
+        entry = parser.parse_line(line)
+        if len(entry) > 1 or entry['dialogue']:
+            turns.append(entry)
+
+
+def follow(transcript_file, metadata=None, interval=2.0, sentiment=True):
+    """
+    Follows a transcript file that is being appended to and prints the updated
+    analysis after every new chunk of turns.
+
+    Args:
+        transcript_file (str): A .txt transcript, or a .jsonl transcript written by transcript_converter.
+        metadata (dict, optional): Interview fields, e.g. the candidate and interviewer names.
+        interval (float): Seconds between checks for new turns.
+        sentiment (bool): Whether to report sentiment as well.
+    """
+    from transcript_converter import get_line_parser
+    from turn_segmenter import TurnSegmenter
+
+    jsonl = transcript_file.endswith('.jsonl')
+    parser = None if jsonl else get_line_parser()
+
+    with open(transcript_file, 'r', encoding='utf-8') as f:
+        if jsonl:
+            # The first record holds the interview fields
+            header = json.loads(f.readline() or '{}')
+            metadata = metadata or header.get('interview', header)
+
+        analyzer = IncrementalAnalyzer(metadata, sentiment=sentiment)
+        # One segmenter for the whole file, so speakers carry over from one chunk to the next
+        segmenter = None if jsonl else TurnSegmenter(analyzer.candidate, analyzer.interviewer)
+        while True:
+            turns = _read_new_turns(f, parser, segmenter)
+            if turns:
+                analyzer.add_turns(turns)
+                result = analyzer.result()
+                print(f"{analyzer.turn_count} turns: {result['pass_fail']}")
+                for criterion, score in result['scores'].items():
+                    print(f"  {criterion}: {score}")
+                if sentiment:
+                    for role, averages in analyzer.sentiment().items():
+                        compound = f"{averages['compound']:.2f}" if averages else "n/a"
+                        print(f"  {role} compound sentiment: {compound}")
+            time.sleep(interval)
+
+
+def main():
+    """Main function to parse arguments and follow a live transcript."""
+    parser = argparse.ArgumentParser(description='Analyze a transcript incrementally as it is appended to.')
+    parser.add_argument('file', help='Transcript file being written (.txt or .jsonl)')
+    parser.add_argument('-m', '--metadata', help='JSON file with interview metadata (candidate and interviewer names)')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between checks for new turns (default: 2)')
+    parser.add_argument('--no-sentiment', action='store_true', help='Only keep rubric scores up to date')
+    log_config.add_arguments(parser)
+
+    args = parser.parse_args()
+    log_config.configure_from_args(args)
+
+    if not os.path.isfile(args.file):
+        logger.error("File '%s' not found.", args.file)
+        return 1
+
+    metadata = None
+    if args.metadata:
+        with open(args.metadata, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        metadata = metadata.get('interview', metadata)
+
+    try:
+        follow(args.file, metadata, args.interval, not args.no_sentiment)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
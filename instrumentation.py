@@ -0,0 +1,228 @@
+"""
+Instrumentation
+
+Per-stage timers, counters and histograms for finding out where a batch run spends its
+time (conversion, loading, sentence tokenization, VADER, keyword matching, writing).
+
+Metrics are off by default: timer() then returns a shared no-op context manager and
+count()/observe() return immediately, so the instrumented code pays one global lookup
+per call. enable() switches them on for the process. Pool workers collect() their
+metrics after each task and the parent merge()s them, so the summary covers the
+whole run.
+
+Usage:
+
+    with instrumentation.timer('vader'):
+        scores = score_batch(sentences)
+    instrumentation.count('sentences', len(sentences))
+"""
+
+import json
+import math
+import time
+
+# Upper bounds of the histogram buckets for durations, in seconds
+TIME_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0, math.inf)
+
+_metrics = None
+
+
+class Histogram:
+    """Counts observations into fixed buckets and keeps their count, sum, min and max."""
+
+    def __init__(self, bounds=TIME_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * len(self.bounds)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[index] += 1
+                break
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'buckets': [['+Inf' if math.isinf(bound) else bound, count]
+                        for bound, count in zip(self.bounds, self.buckets)]
+        }
+
+    def merge(self, snapshot):
+        self.count += snapshot['count']
+        self.total += snapshot['sum']
+        if snapshot['count']:
+            self.min = min(self.min, snapshot['min'])
+            self.max = max(self.max, snapshot['max'])
+        for index, (_, count) in enumerate(snapshot['buckets']):
+            self.buckets[index] += count
+
+
+class Metrics:
+    """The counters and histograms of one process."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value, bounds=TIME_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(bounds)
+        histogram.observe(value)
+
+    def snapshot(self):
+        """Returns the metrics as a JSON-serializable dictionary."""
+        return {
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        }
+
+    def merge(self, snapshot):
+        """Adds the metrics of a snapshot, e.g. one collected in a worker process."""
+        for name, value in snapshot['counters'].items():
+            self.count(name, value)
+        for name, histogram_snapshot in snapshot['histograms'].items():
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                bounds = [math.inf if bound == '+Inf' else bound for bound, _ in histogram_snapshot['buckets']]
+                histogram = self.histograms[name] = Histogram(bounds)
+            histogram.merge(histogram_snapshot)
+
+    def summary_table(self):
+        """Formats the stage timings and counters as a plain-text table."""
+        lines = [f"{'stage':<16}{'count':>8}{'total s':>11}{'mean ms':>11}{'min ms':>10}{'max ms':>10}"]
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            if not histogram.count:
+                continue
+            lines.append(
+                f"{name:<16}{histogram.count:>8}{histogram.total:>11.3f}"
+                f"{histogram.total / histogram.count * 1000:>11.2f}"
+                f"{histogram.min * 1000:>10.2f}{histogram.max * 1000:>10.2f}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<32}{'value':>12}")
+            for name in sorted(self.counters):
+                lines.append(f"{name:<32}{self.counters[name]:>12}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable():
+    """Switches metrics on for this process and returns them."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def disable():
+    """Switches metrics off and discards them."""
+    global _metrics
+    _metrics = None
+
+
+def is_enabled():
+    return _metrics is not None
+
+
+def get_metrics():
+    """Returns the metrics of this process, or None if they are off."""
+    return _metrics
+
+
+def timer(stage):
+    """
+    Returns a context manager that records the duration of a stage in its histogram.
+
+    Args:
+        stage (str): Stage name, e.g. 'load' or 'vader'.
+    """
+    if _metrics is None:
+        return _NULL_TIMER
+    return _Timer(_metrics, stage)
+
+
+def count(name, value=1):
+    """Adds to a counter, if metrics are on."""
+    if _metrics is not None:
+        _metrics.count(name, value)
+
+
+def observe(name, value, bounds=TIME_BUCKETS):
+    """Records a value in a histogram, if metrics are on."""
+    if _metrics is not None:
+        _metrics.observe(name, value, bounds)
+
+
+def collect():
+    """
+    Returns a snapshot of this process's metrics and starts them over, so that a worker
+    can hand its metrics to the parent after every task without counting anything twice.
+
+    Returns:
+        dict: The snapshot, or None if metrics are off.
+    """
+    global _metrics
+    if _metrics is None:
+        return None
+    snapshot = _metrics.snapshot()
+    _metrics = Metrics()
+    return snapshot
+
+
+def merge(snapshot):
+    """Adds a snapshot from collect() to this process's metrics, if metrics are on."""
+    if _metrics is not None and snapshot:
+        _metrics.merge(snapshot)
+
+
+def write_json(path):
+    """Writes this process's metrics to a JSON file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(_metrics.snapshot() if _metrics else {'counters': {}, 'histograms': {}}, f, indent=2)
@@ -1,5 +1,9 @@
 import json
 import csv
+import logging
+import log_config
+
+logger = logging.getLogger(__name__)
 
 
 def json_to_csv(json_file, csv_file):
@@ -14,13 +18,13 @@ def json_to_csv(json_file, csv_file):
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
     except FileNotFoundError:
-        print(f"Error: File not found: {json_file}")
+        logger.error("File not found: %s", json_file)
         return
     except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in file: {json_file}")
+        logger.error("Invalid JSON in file: %s", json_file)
         return
     except Exception as e:
-        print(f"Error loading JSON: {e}")
+        logger.error("Error loading JSON: %s", e)
         return
 
     # Extract data for headers
@@ -35,7 +39,7 @@ def json_to_csv(json_file, csv_file):
         recommendation = data.get("synthesis_and_recommendation", {}).get("recommendation", "")
 
     except Exception as e:
-        print(f"Error extracting metadata for headers: {e}")
+        logger.error("Error extracting metadata for headers: %s", e)
         interview_value = ""
         candidate_value = ""
         interviewer_value = ""
@@ -57,15 +61,16 @@ def json_to_csv(json_file, csv_file):
             data_row = [interview_value, candidate_value, interviewer_value, candidate_sentiment, interviewer_sentiment, interview_result, recommendation]
             writer.writerow(data_row)
 
-        print(f"Successfully converted {json_file} to {csv_file}")
+        logger.info("Successfully converted %s to %s", json_file, csv_file)
 
     except Exception as e:
-        print(f"Error writing to CSV: {e}")
+        logger.error("Error writing to CSV: %s", e)
         return
 
 
 # Example usage
 if __name__ == "__main__":
+    log_config.configure()
     input_json_file = "synthesis_output_with_sentiment.json"  # Replace with your JSON file
     output_csv_file = "output.csv"  # Replace with your desired CSV file name
     json_to_csv(input_json_file, output_csv_file)
\ No newline at end of file
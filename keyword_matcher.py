@@ -0,0 +1,179 @@
+"""
+Keyword Matcher
+
+Matches groups of rubric keywords against a token index of the transcript, built
+once, so that every keyword or phrase is counted on whole-word boundaries with a
+hash lookup instead of a substring search over the text.
+"""
+
+import heapq
+from collections import Counter
+from itertools import islice, repeat
+
+from token_index import TOKEN_PATTERN, TokenIndex, tokenize
+
+
+class KeywordMatcher:
+    """
+    Counts every keyword from a set of named keyword groups in a transcript.
+
+    Keywords are split into tokens the way the transcript is (see token_index), so
+    "so" is only found as a word of its own and "edge case" only as two consecutive
+    words. Overlapping keywords ("so" / "so if") are all counted.
+    """
+
+    def __init__(self, keyword_groups):
+        """
+        Args:
+            keyword_groups (dict): Maps a group name to a list of keywords.
+        """
+        self.keyword_groups = {
+            group: [keyword.lower() for keyword in keywords]
+            for group, keywords in keyword_groups.items()
+        }
+
+        self.vocabulary = sorted({keyword for keywords in self.keyword_groups.values() for keyword in keywords})
+
+        # The tokens of each keyword; keywords without any (e.g. blank ones) never match
+        self.phrases = {}
+        for keyword in self.vocabulary:
+            phrase = tuple(tokenize(keyword))
+            if phrase:
+                self.phrases[keyword] = phrase
+        self.max_tokens = max((len(phrase) for phrase in self.phrases.values()), default=0)
+
+        # Byte segments can only be scanned exactly when ASCII lowercasing is enough
+        self.ascii_only = all(keyword.isascii() for keyword in self.vocabulary)
+        self._bytes_phrases = None
+
+    def scan_index(self, index):
+        """
+        Counts the occurrences of every keyword in an indexed text.
+
+        Args:
+            index (TokenIndex): Index of the lowercased text, e.g. Transcript.token_index. An index
+                                of byte segments requires ascii_only.
+
+        Returns:
+            Counter: Maps each keyword found to its number of occurrences.
+        """
+        return self._count(index, self._index_phrases(index))
+
+    def hits(self, index, keywords, limit):
+        """
+        Returns the first occurrences of some keywords in an indexed text, in text order.
+
+        Reads the positions that scan_index() already looked up and cached in the index,
+        so nothing is scanned again.
+
+        Args:
+            index (TokenIndex): Index of the lowercased text, as for scan_index().
+            keywords (iterable): Lowercased keywords to list the occurrences of.
+            limit (int): Number of occurrences to return at most.
+
+        Returns:
+            list: (token position, keyword) pairs, by position.
+        """
+        phrases = self._index_phrases(index)
+        streams = [zip(index.positions(phrases[keyword]), repeat(keyword))
+                   for keyword in sorted(set(keywords)) if keyword in phrases]
+        return list(islice(heapq.merge(*streams), limit))
+
+    def _index_phrases(self, index):
+        # The keyword phrases as tokens of the index's type
+        if not index.binary:
+            return self.phrases
+        if not self.ascii_only:
+            raise ValueError("Byte segments can only be scanned for ASCII keywords.")
+        if self._bytes_phrases is None:
+            self._bytes_phrases = {
+                keyword: tuple(token.encode('ascii') for token in phrase)
+                for keyword, phrase in self.phrases.items()
+            }
+        return self._bytes_phrases
+
+    def scan(self, text, lowered=False, skip=0):
+        """
+        Counts the occurrences of every keyword in the text.
+
+        Args:
+            text (str): The text to scan. It is lowercased once here.
+            lowered (bool): Whether the text is already lowercase, to skip that copy.
+            skip (int): Length of a prefix that was already scanned as the end of earlier text
+                        (see tail()); only occurrences that end after it are counted. Used to
+                        continue a scan over appended text without losing phrases that span
+                        the seam. The prefix must end between tokens, e.g. with a space.
+
+        Returns:
+            Counter: Maps each keyword found to its number of occurrences.
+        """
+        if not lowered:
+            text = text.lower()
+        found = self.scan_index(TokenIndex.from_text(text, lowered=True))
+        if skip and found:
+            # Tokens do not cross the seam, so the prefix alone holds the occurrences counted before
+            found.subtract(self.scan_index(TokenIndex.from_text(text[:skip], lowered=True)))
+            found = +found
+        return found
+
+    def tail(self, text):
+        """
+        Returns the end of a text that has to be scanned again together with text appended
+        to it, so that phrases spanning the seam are found: its last max_tokens - 1 tokens.
+
+        Args:
+            text (str): Lowercased text that ends between tokens.
+
+        Returns:
+            str: A suffix of the text, starting at a token.
+        """
+        keep = self.max_tokens - 1
+        if keep <= 0:
+            return ""
+        starts = [match.start() for match in TOKEN_PATTERN.finditer(text)]
+        return text[starts[-keep]:] if len(starts) >= keep else text
+
+    @staticmethod
+    def _count(index, phrases):
+        found = Counter()
+        for keyword, phrase in phrases.items():
+            count = index.count(phrase)
+            if count:
+                found[keyword] = count
+        return found
+
+    def group_hits(self, found, groups=None):
+        """
+        Reduces keyword occurrences from scan() to per-group distinct hit counts.
+
+        Args:
+            found (Counter): Keyword occurrences as returned by scan().
+            groups (iterable, optional): The groups to count. Defaults to all groups.
+
+        Returns:
+            dict: Maps each group name to its number of distinct keyword hits.
+        """
+        if groups is None:
+            groups = self.keyword_groups
+        return {
+            group: sum(1 for keyword in self.keyword_groups[group] if found[keyword])
+            for group in groups
+        }
+
+    def group_occurrences(self, found, groups=None):
+        """
+        Reduces keyword occurrences from scan() to per-group occurrence totals.
+
+        Args:
+            found (Counter): Keyword occurrences as returned by scan().
+            groups (iterable, optional): The groups to count. Defaults to all groups.
+
+        Returns:
+            dict: Maps each group name to the number of occurrences of all its keywords.
+        """
+        if groups is None:
+            groups = self.keyword_groups
+        return {
+            group: sum(found[keyword] for keyword in self.keyword_groups[group])
+            for group in groups
+        }
@@ -0,0 +1,193 @@
+"""
+Log Config
+
+Leveled logging for the scripts and the batch pipeline, built on the standard logging
+module. Each module logs through logging.getLogger(__name__); the entry points call
+configure() (or add_arguments() and configure_from_args()) once at start-up.
+
+Messages go to stderr, as plain text or as one JSON object per line (--log-format json),
+so results printed to stdout stay machine-readable. Fields passed with extra={...} are
+included in the JSON records.
+
+Warnings that can repeat for every turn are not logged from the loop that finds them:
+the loop adds them to a WarningTally, which logs each kind once per file with its count,
+e.g. "12 turns skipped for unknown speaker in interview.json". A tally does nothing,
+not even counting, when warnings are off (--quiet). Anything else that repeats is
+rate-limited to a number of records per message.
+"""
+
+import json
+import logging
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Records per message (per logger and format string) before further ones are dropped
+DEFAULT_RATE_LIMIT = 20
+
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_settings = {}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Passes at most `limit` records of each message at WARNING and below, and counts the rest.
+    Errors are never dropped.
+    """
+
+    def __init__(self, limit=DEFAULT_RATE_LIMIT):
+        super().__init__()
+        self.limit = limit
+        self.seen = Counter()
+
+    def filter(self, record):
+        if record.levelno > logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        self.seen[key] += 1
+        return self.seen[key] <= self.limit
+
+    def suppressed(self):
+        """Returns the number of dropped records per (logger name, message)."""
+        return {key: count - self.limit for key, count in self.seen.items() if count > self.limit}
+
+
+class WarningTally:
+    """
+    Collects repeated warnings about one file and logs each kind once, with its count.
+
+    Usage:
+
+        tally = WarningTally(logger)
+        for turn in turns:
+            ...
+            tally.add("turns skipped for unknown speaker", speaker)
+        tally.flush(transcript.source)
+    """
+
+    # Distinct example values listed per kind of warning
+    EXAMPLES = 3
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.enabled = logger.isEnabledFor(logging.WARNING)
+        self.counts = Counter()
+        self.examples = {}
+
+    def add(self, reason, example=None):
+        """
+        Counts one occurrence of a warning.
+
+        Args:
+            reason (str): What happened, phrased to follow a count, e.g. "turns skipped for unknown speaker".
+            example: A value to list in the warning, e.g. the speaker name.
+        """
+        if not self.enabled:
+            return
+        self.counts[reason] += 1
+        if example is not None:
+            examples = self.examples.setdefault(reason, [])
+            if len(examples) < self.EXAMPLES and example not in examples:
+                examples.append(example)
+
+    def flush(self, source=None):
+        """
+        Logs one warning per kind counted since the last flush, then starts over.
+
+        Args:
+            source (str, optional): The file the warnings are about.
+        """
+        for reason, count in self.counts.items():
+            # The reason is part of the format string, so the rate limit applies per kind of warning
+            message = "%d " + reason.replace('%', '%%')
+            args = [count]
+            if source:
+                message += " in %s"
+                args.append(source)
+            examples = self.examples.get(reason)
+            if examples:
+                message += " (e.g. %s)"
+                args.append(", ".join(map(str, examples)))
+            self.logger.warning(message, *args, extra={'count': count, 'reason': reason, 'source': source})
+        self.counts.clear()
+        self.examples.clear()
+
+
+def configure(level='info', log_format='text', rate_limit=DEFAULT_RATE_LIMIT, stream=None):
+    """
+    Sets up logging for the process, replacing any handlers set up before.
+
+    Args:
+        level (str): Lowest level logged: 'debug', 'info', 'warning' or 'error'.
+        log_format (str): 'text' or 'json'.
+        rate_limit (int): Records per message at WARNING and below before further ones are dropped (0: no limit).
+        stream: Stream to log to (default: stderr).
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JSONFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    if rate_limit:
+        handler.addFilter(RateLimitFilter(rate_limit))
+
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, level.upper()))
+
+    _settings.clear()
+    _settings.update(level=level, log_format=log_format, rate_limit=rate_limit)
+
+
+def settings():
+    """Returns the arguments of the last configure() call, e.g. to configure a worker process the same way."""
+    return dict(_settings)
+
+
+def add_arguments(parser):
+    """Adds the logging options shared by the entry points to an argparse parser."""
+    group = parser.add_argument_group('logging')
+    verbosity = group.add_mutually_exclusive_group()
+    verbosity.add_argument('-q', '--quiet', action='store_true', help='Only log errors')
+    verbosity.add_argument('-v', '--verbose', action='store_true', help='Log debug messages as well')
+    group.add_argument('--log-format', choices=('text', 'json'), default='text',
+                       help='Log as plain text or as JSON lines (default: text)')
+    group.add_argument('--log-rate-limit', type=int, default=DEFAULT_RATE_LIMIT,
+                       help=f'Warnings logged per message before the rest are dropped, 0 for no limit '
+                            f'(default: {DEFAULT_RATE_LIMIT})')
+
+
+def configure_from_args(args):
+    """Configures logging from the options added by add_arguments()."""
+    level = 'error' if args.quiet else 'debug' if args.verbose else 'info'
+    configure(level, args.log_format, args.log_rate_limit)
+
+
+def report_suppressed(logger):
+    """Logs how many records the rate limit dropped, if any, e.g. at the end of a run."""
+    for handler in logging.getLogger().handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, RateLimitFilter):
+                for (name, message), count in log_filter.suppressed().items():
+                    logger.info("%d more messages like %r from %s were not logged", count, message, name)
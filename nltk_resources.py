@@ -0,0 +1,110 @@
+"""
+NLTK Resources
+
+Resolves the NLTK data the sentiment analysis needs (the VADER lexicon and the Punkt
+sentence tokenizer) lazily, on first use, from a local data directory. Nothing is
+downloaded: a missing resource raises MissingNLTKDataError explaining how to install it.
+
+The data directory can be set with set_data_dir() or the TRANSCRIPT_ANALYZER_NLTK_DATA
+environment variable; NLTK's own search path (including NLTK_DATA) is used as well.
+"""
+
+import os
+
+DATA_DIR_ENV = 'TRANSCRIPT_ANALYZER_NLTK_DATA'
+
+# Resource name -> candidate paths in the NLTK data directory, in order of preference
+RESOURCES = {
+    'vader_lexicon': ['sentiment/vader_lexicon.zip', 'sentiment/vader_lexicon'],
+    'punkt_tab': ['tokenizers/punkt_tab'],
+    'punkt': ['tokenizers/punkt'],
+}
+
+_resolved = set()
+_sentence_tokenizer = None
+
+
+class MissingNLTKDataError(LookupError):
+    """Raised when a required NLTK resource is not installed locally."""
+
+
+def set_data_dir(path):
+    """
+    Sets the local directory NLTK data is resolved from.
+
+    The directory is also exported through the environment so worker processes use it.
+
+    Args:
+        path (str): Directory laid out like an NLTK data directory.
+    """
+    os.environ[DATA_DIR_ENV] = path
+    _resolved.clear()
+
+
+def _search_path():
+    import nltk
+
+    data_dir = os.environ.get(DATA_DIR_ENV)
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+    return nltk.data.path
+
+
+def require(name):
+    """
+    Makes sure an NLTK resource is installed locally, without downloading it.
+
+    Args:
+        name (str): A key of RESOURCES, e.g. 'vader_lexicon'.
+
+    Raises:
+        MissingNLTKDataError: If the resource cannot be found.
+    """
+    if name in _resolved:
+        return
+
+    import nltk
+
+    search_path = _search_path()
+    for resource_path in RESOURCES[name]:
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            continue
+        _resolved.add(name)
+        return
+
+    raise MissingNLTKDataError(
+        f"NLTK resource '{name}' is not installed. Searched: {', '.join(search_path)}. "
+        f"Install it on a machine with network access with "
+        f"'python -m nltk.downloader -d <dir> {name}' and point {DATA_DIR_ENV} (or --nltk-data) at <dir>."
+    )
+
+
+def punkt_resource():
+    """
+    Returns the Punkt resource the installed NLTK loads: 'punkt_tab' for NLTK 3.8.2 and
+    later, which cannot use the pickled 'punkt' models, and 'punkt' before that.
+    """
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+    except ImportError:
+        return 'punkt'
+    return 'punkt_tab'
+
+
+def sentence_tokenizer():
+    """Returns the English Punkt sentence tokenizer, loading it once per process."""
+    global _sentence_tokenizer
+    if _sentence_tokenizer is None:
+        resource = punkt_resource()
+        require(resource)
+        if resource == 'punkt_tab':
+            from nltk.tokenize.punkt import PunktTokenizer
+            _sentence_tokenizer = PunktTokenizer('english')
+        else:
+            # NLTK releases before punkt_tab ship a pickled tokenizer
+            import nltk
+            _sentence_tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+    return _sentence_tokenizer
+
@@ -0,0 +1,116 @@
+"""
+Result Cache
+
+An on-disk cache of analysis results keyed by a hash of the transcript content and of
+the rubric/analyzer version, so unchanged transcripts are not re-analyzed on re-runs.
+Entries are JSON files; the cache is bounded in size and evicts the least recently
+used entries first (recency is tracked through file modification times). Once it is
+over its bound, entries are evicted down to 90% of it, so the directory is scanned
+once per batch of new entries rather than on every put.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Eviction frees space down to this fraction of max_bytes, so it runs once per batch of puts
+LOW_WATER_MARK = 0.9
+
+
+class ResultCache:
+    """A size-bounded LRU cache of JSON results stored in a directory."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache entries. Created if missing.
+            max_bytes (int): Total size the entries may take before the oldest are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._total_bytes = 0
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    self._total_bytes += entry.stat().st_size
+
+    @staticmethod
+    def make_key(content, version):
+        """
+        Builds a cache key from transcript content and a version string.
+
+        Args:
+            content (bytes): The raw transcript file content.
+            version (str): Identifies the rubric and analyzer the result was produced with.
+
+        Returns:
+            str: Hex digest used as the entry name.
+        """
+        digest = hashlib.sha256()
+        digest.update(version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        """
+        Returns the cached result for a key, or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """
+        Stores a result, then evicts least recently used entries down to the low-water mark
+        if the cache is over its size bound.
+        """
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+
+        try:
+            self._total_bytes -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)  # Atomic, so readers never see a partial entry
+        self._total_bytes += os.path.getsize(path)
+
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        with os.scandir(self.cache_dir) as entries:
+            files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                     for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+
+        files.sort()
+        self._total_bytes = sum(size for _, size, _ in files)
+        target = self.max_bytes * LOW_WATER_MARK
+        for _, size, path in files:
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
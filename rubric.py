@@ -0,0 +1,368 @@
+"""
+Declarative Rubrics
+
+A rubric is a data file (JSON or YAML) that lists the interview criteria, the keyword
+groups each criterion counts, and the ordered score levels with the conditions and
+assessment text for each level. Rubrics are compiled into a RubricEvaluator, which
+folds the keywords of every criterion (and of every rubric, when several versions are
+compared) into one KeywordMatcher so a transcript is scanned once however many
+rubrics are scored.
+
+Rubric format:
+
+    {
+      "name": "default",
+      "version": "3",
+      "counting": "per_1000_words",
+      "fail_scores": [1, 2],
+      "criteria": [
+        {
+          "name": "Verifies assumptions",
+          "speaker": "candidate",
+          "keyword_groups": {"assumption": ["what if", "edge case", ...]},
+          "levels": [
+            {"score": 4, "when": [{"groups": ["assumption"], "min": 6}], "assessment": "..."},
+            ...
+            {"score": 1, "assessment": "..."}
+          ]
+        }
+      ]
+    }
+
+Keywords and phrases match whole words: "so" is not found in "also", and "edge case"
+only where the two words follow each other.
+
+Each clause in "when" sums the counts of the listed groups and checks it against "min"
+and/or "max". What a group counts is set by the rubric's "counting":
+
+    distinct         keywords of the group that occur at least once (the default)
+    occurrences      occurrences of all keywords of the group
+    per_1000_words   occurrences per 1,000 words of the transcript, so that thresholds
+                     mean the same for short and long interviews
+
+A criterion with a "speaker" ("candidate" or "interviewer") only counts what that
+speaker says, and per_1000_words is then relative to that speaker's words, so the
+interviewer asking about "time complexity" earns the candidate nothing. Speakers are
+resolved from the transcript's candidate and interviewer names, as for sentiment.
+Criteria without one count the dialogue of the whole transcript, and so do all
+criteria of a transcript in which no turn is attributed to either speaker (e.g. a
+text transcript without speaker labels).
+
+When occurrences are counted, no keyword of a group may contain another keyword of
+the same group ("list" and "linked list"), which would count the same words twice.
+
+A level applies when all of its clauses hold, and a level without
+"when" always applies. Levels are tried in order and the first one that applies gives
+the score. A clause with "max": 0 acts as a veto, e.g. any guessing keyword rules out
+the higher debugging scores.
+"""
+
+import hashlib
+import json
+import os
+
+from keyword_matcher import KeywordMatcher
+from token_index import TokenIndex, tokenize
+from transcript import ROLES
+
+RUBRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rubrics')
+DEFAULT_RUBRIC_PATH = os.path.join(RUBRICS_DIR, 'default.json')
+
+# What the keyword groups of a rubric count; see the module docstring
+COUNTING_MODES = ('distinct', 'occurrences', 'per_1000_words')
+
+
+class Rubric:
+    """A validated rubric definition."""
+
+    def __init__(self, name, version, criteria, fail_scores=(1, 2), counting='distinct'):
+        self.name = name
+        self.version = str(version)
+        self.criteria = criteria
+        self.fail_scores = list(fail_scores)
+        self.counting = counting
+
+    @property
+    def key(self):
+        """Identifier combining the rubric name and version, e.g. 'default@1'."""
+        return f"{self.name}@{self.version}"
+
+    @property
+    def fingerprint(self):
+        """Hash of the full rubric definition, which changes whenever any keyword, threshold or text does."""
+        definition = {
+            'name': self.name,
+            'version': self.version,
+            'fail_scores': self.fail_scores,
+            'counting': self.counting,
+            'criteria': self.criteria
+        }
+        encoded = json.dumps(definition, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    @property
+    def criterion_names(self):
+        return [criterion['name'] for criterion in self.criteria]
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a rubric from its parsed JSON/YAML form.
+
+        Args:
+            data (dict): The rubric definition.
+
+        Returns:
+            Rubric: The validated rubric.
+
+        Raises:
+            ValueError: If the definition is malformed.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get('criteria'), list):
+            raise ValueError("Invalid rubric format. Expected a dictionary with a 'criteria' list.")
+
+        counting = data.get('counting', 'distinct')
+        if counting not in COUNTING_MODES:
+            raise ValueError(f"Invalid rubric format. 'counting' must be one of {', '.join(COUNTING_MODES)}.")
+
+        criteria = []
+        for criterion in data['criteria']:
+            name = criterion.get('name') if isinstance(criterion, dict) else None
+            if not name:
+                raise ValueError("Invalid rubric format. Every criterion needs a 'name'.")
+
+            keyword_groups = criterion.get('keyword_groups', {})
+            speaker = criterion.get('speaker')
+            if speaker is not None and speaker not in ROLES:
+                raise ValueError(f"Invalid rubric format. The 'speaker' of '{name}' must be one of {', '.join(ROLES)}.")
+
+            levels = criterion.get('levels')
+            if not isinstance(levels, list) or not levels:
+                raise ValueError(f"Invalid rubric format. Criterion '{name}' has no 'levels'.")
+
+            for level in levels:
+                if 'score' not in level or 'assessment' not in level:
+                    raise ValueError(f"Invalid rubric format. Every level of '{name}' needs a 'score' and an 'assessment'.")
+                for clause in level.get('when', []):
+                    unknown = [group for group in clause.get('groups', []) if group not in keyword_groups]
+                    if unknown or not clause.get('groups'):
+                        raise ValueError(f"Invalid rubric format. Criterion '{name}' refers to unknown keyword groups: {unknown}")
+                    if 'min' not in clause and 'max' not in clause:
+                        raise ValueError(f"Invalid rubric format. Every clause of '{name}' needs a 'min' or 'max'.")
+
+            if counting != 'distinct':
+                for group, keywords in keyword_groups.items():
+                    nested = _nested_keywords(keywords)
+                    if nested:
+                        raise ValueError(f"Invalid rubric format. Keyword group '{group}' of '{name}' counts "
+                                         f"occurrences, but '{nested[1]}' contains '{nested[0]}'.")
+
+            definition = {
+                'name': name,
+                'keyword_groups': keyword_groups,
+                'levels': levels
+            }
+            if speaker is not None:
+                definition['speaker'] = speaker
+            criteria.append(definition)
+
+        return cls(
+            name=data.get('name', 'rubric'),
+            version=data.get('version', '1'),
+            criteria=criteria,
+            fail_scores=data.get('fail_scores', [1, 2]),
+            counting=counting
+        )
+
+
+def _nested_keywords(keywords):
+    """Returns a pair of keywords (inner, outer) where outer contains inner as whole words, or None."""
+    phrases = [(keyword, tuple(tokenize(keyword.lower()))) for keyword in keywords]
+    for inner, inner_tokens in phrases:
+        for outer, outer_tokens in phrases:
+            if len(outer_tokens) <= len(inner_tokens) or not inner_tokens:
+                continue
+            if any(outer_tokens[start:start + len(inner_tokens)] == inner_tokens
+                   for start in range(len(outer_tokens) - len(inner_tokens) + 1)):
+                return inner, outer
+    return None
+
+
+def load_rubric(rubric_file):
+    """
+    Loads a rubric from a JSON or YAML file.
+
+    Args:
+        rubric_file (str): Path to a .json, .yaml or .yml rubric file.
+
+    Returns:
+        Rubric: The loaded rubric.
+    """
+    with open(rubric_file, 'r', encoding='utf-8') as f:
+        if rubric_file.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Loading YAML rubrics requires PyYAML (pip install pyyaml).")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    return Rubric.from_dict(data)
+
+
+class RubricEvaluator:
+    """
+    Scores transcripts against one or more rubrics with a single keyword scan.
+    """
+
+    def __init__(self, rubrics):
+        """
+        Args:
+            rubrics (list): The Rubric objects to evaluate, in output order.
+        """
+        self.rubrics = list(rubrics)
+
+        # Group names are namespaced by rubric and criterion so they can share one matcher.
+        # Each group is counted in the dialogue of its criterion's speaker (None: everyone).
+        keyword_groups = {}
+        self.group_scopes = {}
+        for rubric_index, rubric in enumerate(self.rubrics):
+            for criterion_index, criterion in enumerate(rubric.criteria):
+                for group, keywords in criterion['keyword_groups'].items():
+                    keyword_groups[(rubric_index, criterion_index, group)] = keywords
+                    self.group_scopes.setdefault(criterion.get('speaker'), []).append(
+                        (rubric_index, criterion_index, group))
+
+        self.matcher = KeywordMatcher(keyword_groups)
+
+        # The dialogue scopes that have to be scanned, e.g. (None,) or ('candidate',)
+        self.scopes = tuple(sorted(self.group_scopes, key=lambda scope: (scope is not None, scope or '')))
+
+    def evaluate_indexes(self, indexes, evidence=0):
+        """
+        Scores a transcript indexed per speaker against every rubric, scanning only the
+        indexes that some criterion counts.
+
+        Args:
+            indexes (dict): Maps None to the index of all dialogue and each role to the index of
+                            that speaker's dialogue, e.g. Transcript.token_indexes(). A role
+                            without an index counts as a speaker who said nothing.
+            evidence (int): Number of keyword hits to list per criterion, 0 for none.
+
+        Returns:
+            list: One analysis result per rubric, as returned by evaluate_scopes(). With evidence, each
+                  result also holds 'evidence', mapping every criterion name to its first hits
+                  as {'turn', 'token', 'keyword', 'group'} dictionaries: the index of the turn
+                  (the text number in the index), the position of the hit among the turn's
+                  tokens, the keyword found and its keyword group. Groups that only cap a score
+                  (e.g. guessing) list counter-evidence, so the group tells them apart.
+        """
+        if not any(role in indexes for role in ROLES):
+            # No dialogue is attributed to a speaker, so every criterion counts all of it
+            indexes = {scope: indexes[None] for scope in self.scopes + (None,)}
+
+        scoped = {}
+        for scope in self.scopes:
+            index = indexes.get(scope)
+            if index is None:
+                index = TokenIndex([], indexes[None].binary)
+            scoped[scope] = (self.matcher.scan_index(index), index.word_count)
+        results = self.evaluate_scopes(scoped)
+
+        if evidence:
+            for rubric_index, result in enumerate(results):
+                result['evidence'] = self._evidence(rubric_index, indexes, evidence)
+        return results
+
+    def _evidence(self, rubric_index, indexes, limit):
+        # Hit positions come from the postings the scan just cached; turns are found by binary search
+        evidence = {}
+        for criterion_index, criterion in enumerate(self.rubrics[rubric_index].criteria):
+            index = indexes.get(criterion.get('speaker'))
+            # A keyword listed in several groups of the criterion is reported under the first
+            keyword_group = {}
+            for group in criterion['keyword_groups']:
+                for keyword in self.matcher.keyword_groups[(rubric_index, criterion_index, group)]:
+                    keyword_group.setdefault(keyword, group)
+            hits = []
+            if index is not None and keyword_group:
+                for position, keyword in self.matcher.hits(index, keyword_group, limit):
+                    turn_index, token = index.locate(position)
+                    hits.append({'turn': turn_index, 'token': token, 'keyword': keyword,
+                                 'group': keyword_group[keyword]})
+            evidence[criterion['name']] = hits
+        return evidence
+
+    def evaluate_scopes(self, scoped):
+        """
+        Scores keyword occurrences counted separately in each speaker's dialogue.
+
+        Args:
+            scoped (dict): Maps each scope in self.scopes (None for all dialogue, or a role) to a
+                           (found, word_count) pair: the keyword occurrences, as returned by the
+                           matcher's scan(), and the number of words, which rubrics counting
+                           per 1,000 words require.
+
+        Returns:
+            list: One analysis result per rubric, in the order the rubrics were given.
+                  Each result holds 'scores', 'assessment_details' and 'pass_fail'.
+
+        Raises:
+            ValueError: If a scope some criterion counts is missing.
+        """
+        countings = {rubric.counting for rubric in self.rubrics}
+        counts = {counting: {} for counting in countings}
+        for scope, groups in self.group_scopes.items():
+            if scope not in scoped:
+                raise ValueError(f"Rubric criteria of the {scope} need the dialogue of each speaker.")
+            found, word_count = scoped[scope]
+            for counting in countings:
+                if counting == 'distinct':
+                    counts[counting].update(self.matcher.group_hits(found, groups))
+                    continue
+                occurrences = self.matcher.group_occurrences(found, groups)
+                if counting == 'per_1000_words':
+                    if word_count is None:
+                        raise ValueError("Rubrics counting per 1,000 words need the transcript's word count.")
+                    scale = 1000 / word_count if word_count else 0
+                    occurrences = {group: total * scale for group, total in occurrences.items()}
+                counts[counting].update(occurrences)
+
+        return [self._evaluate_rubric(rubric_index, rubric, counts[rubric.counting])
+                for rubric_index, rubric in enumerate(self.rubrics)]
+
+    def _evaluate_rubric(self, rubric_index, rubric, counts):
+        scores = {}
+        assessment = {}
+
+        for criterion_index, criterion in enumerate(rubric.criteria):
+            name = criterion['name']
+            scores[name] = 'N/A'  # Used when no level applies
+            for level in criterion['levels']:
+                if all(self._clause_holds(clause, counts, rubric_index, criterion_index)
+                       for clause in level.get('when', [])):
+                    scores[name] = level['score']
+                    assessment[name] = level['assessment']
+                    break
+
+        pass_fail = "Pass"
+        for criterion_score in scores.values():
+            if criterion_score in rubric.fail_scores:
+                pass_fail = "Fail"
+                break
+
+        return {
+            "scores": scores,
+            "assessment_details": assessment,
+            "pass_fail": pass_fail
+        }
+
+    @staticmethod
+    def _clause_holds(clause, counts, rubric_index, criterion_index):
+        total = sum(counts[(rubric_index, criterion_index, group)] for group in clause['groups'])
+        if 'min' in clause and total < clause['min']:
+            return False
+        if 'max' in clause and total > clause['max']:
+            return False
+        return True
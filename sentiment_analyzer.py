@@ -1,138 +1,272 @@
 import json
-from nltk.sentiment.vader import SentimentIntensityAnalyzer  # Requires nltk.download('vader_lexicon')
-from nltk import tokenize
-import nltk  # Import nltk
-import re
-import ssl
-
-# Handle SSL certificate verification issues (common on macOS)
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-    ssl._create_default_https_context = _create_unverified_https_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-# Make sure the required NLTK data is downloaded
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    print("Downloading required NLTK data...")
-    nltk.download('vader_lexicon')
-
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-def analyze_sentiment(transcript_json_file):
+import logging
+from array import array
+import numpy as np
+import instrumentation
+import log_config
+import nltk_resources
+from transcript import Transcript, load_transcript, time_to_seconds
+
+# Columns returned by score_batch, as named by VADER
+SCORE_FIELDS = ('compound', 'pos', 'neg', 'neu')
+
+# Speaker ids used in the 'speaker' column of sentence score arrays
+SPEAKER_IDS = {'candidate': 0, 'interviewer': 1}
+
+# One row per scored sentence
+SENTENCE_DTYPE = np.dtype([
+    ('speaker', 'u1'),
+    ('turn', 'u4'),
+    ('time', 'f8'),
+    ('compound', 'f8'),
+    ('pos', 'f8'),
+    ('neg', 'f8'),
+    ('neu', 'f8'),
+])
+
+logger = logging.getLogger(__name__)
+
+# Process-wide analyzer, built on first use so the VADER lexicon is loaded once per process
+_analyzer = None
+
+
+def get_sentiment_analyzer():
+    """Returns the shared SentimentIntensityAnalyzer, creating it on first use."""
+    global _analyzer
+    if _analyzer is None:
+        # NLTK is imported and its data resolved only here, on first use
+        nltk_resources.require('vader_lexicon')
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def score_batch(sentences):
     """
-    Analyzes the sentiment of the candidate and interviewer in a mock interview transcript.
+    Scores many sentences with the shared analyzer in one call.
 
     Args:
-        transcript_json_file (str): Path to the JSON file containing the interview transcript.
+        sentences (iterable): The sentences to score.
 
     Returns:
-        dict: A dictionary containing the average sentiment scores for the candidate and interviewer.
-               Returns None if the JSON file is invalid or empty.  Also returns None if no turns exist
+        dict: Columnar scores, mapping 'compound', 'pos', 'neg' and 'neu' to an array('d')
+              with one value per sentence, in input order.
     """
+    polarity_scores = get_sentiment_analyzer().polarity_scores
+    columns = {field: array('d') for field in SCORE_FIELDS}
+    compound = columns['compound'].append
+    positive = columns['pos'].append
+    negative = columns['neg'].append
+    neutral = columns['neu'].append
 
-    try:
-        with open(transcript_json_file, 'r') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: File not found: {transcript_json_file}")
-        return None
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in file: {transcript_json_file}")
-        return None
+    for sentence in sentences:
+        scores = polarity_scores(sentence)
+        compound(scores['compound'])
+        positive(scores['pos'])
+        negative(scores['neg'])
+        neutral(scores['neu'])
 
-    if not isinstance(data, dict) or 'interview' not in data or not isinstance(data['interview'], dict) or 'transcript' not in data['interview'] or not isinstance(data['interview']['transcript'], list):
-        print(f"Error: Invalid JSON format. Expected a dictionary with an 'interview' dictionary containing a 'transcript' list.")
-        return None
+    return columns
 
-    interview_data = data['interview']
-    transcript = interview_data['transcript']
 
-    if not transcript:
-        print("Error: No turns found in the transcript.")
-        return None
+def score_sentences(transcript, speaker_turns):
+    """
+    Scores every sentence of the given turns into a structured array.
 
-    candidate_utterances = []
-    interviewer_utterances = []
+    Args:
+        transcript (Transcript): The loaded transcript.
+        speaker_turns (dict): Maps a speaker role from SPEAKER_IDS to the indices of its turns.
 
-    candidate_name = interview_data.get('candidate', 'Candidate')
-    interviewer_name = interview_data.get('interviewer', 'Interviewer')
+    Returns:
+        numpy.ndarray: One SENTENCE_DTYPE row per sentence, in turn order, with the speaker id,
+                       turn index, turn time in seconds (NaN if unknown) and the VADER scores.
+    """
+    turn_speakers = {turn_index: SPEAKER_IDS[role]
+                     for role, turn_indices in speaker_turns.items()
+                     for turn_index in turn_indices}
+
+    cleaned_sentences = []
+    sentence_speakers = array('B')
+    sentence_turns = array('I')
+    sentence_times = array('d')
+    with instrumentation.timer('tokenize'):
+        for turn_index in sorted(turn_speakers):
+            speaker_id = turn_speakers[turn_index]
+            turn_time = time_to_seconds(transcript.times[turn_index])
+
+            # Sentences are split and cleaned once per turn and cached on the transcript
+            for sentence in transcript.normalized_sentences(turn_index):
+                cleaned_sentences.append(sentence)
+                sentence_speakers.append(speaker_id)
+                sentence_turns.append(turn_index)
+                sentence_times.append(turn_time)
+    instrumentation.count('sentences_scored', len(cleaned_sentences))
+
+    rows = np.empty(len(cleaned_sentences), dtype=SENTENCE_DTYPE)
+    if not cleaned_sentences:
+        return rows
+
+    rows['speaker'] = np.asarray(sentence_speakers)
+    rows['turn'] = np.asarray(sentence_turns)
+    rows['time'] = np.asarray(sentence_times)
+
+    # Score all sentences in one batch with the process-wide analyzer
+    with instrumentation.timer('vader'):
+        scores = score_batch(cleaned_sentences)
+    for field in SCORE_FIELDS:
+        rows[field] = np.asarray(scores[field])
+    return rows
+
+
+def average_by_speaker(sentence_scores):
+    """
+    Averages sentence scores per speaker with a vectorized group-by.
 
-    for turn in transcript:
-        if not isinstance(turn, dict) or 'speaker' not in turn or 'dialogue' not in turn:
-            print("Warning: Skipping invalid turn format. Expected dictionary with 'speaker' and 'dialogue'.")
+    Args:
+        sentence_scores (numpy.ndarray): Rows as returned by score_sentences.
+
+    Returns:
+        dict: Maps each speaker role to its average 'compound', 'positive', 'negative' and
+              'neutral' scores, or to None if the speaker has no scored sentences.
+    """
+    speakers = sentence_scores['speaker']
+    counts = np.bincount(speakers, minlength=len(SPEAKER_IDS))
+    sums = {field: np.bincount(speakers, weights=sentence_scores[field], minlength=len(SPEAKER_IDS))
+            for field in SCORE_FIELDS}
+
+    averages = {}
+    for role, speaker_id in SPEAKER_IDS.items():
+        count = counts[speaker_id]
+        if not count:
+            averages[role] = None
             continue
+        averages[role] = {
+            'compound': float(sums['compound'][speaker_id] / count),
+            'positive': float(sums['pos'][speaker_id] / count),
+            'negative': float(sums['neg'][speaker_id] / count),
+            'neutral': float(sums['neu'][speaker_id] / count)
+        }
+    return averages
 
-        speaker = turn['speaker']
-        utterance = turn['dialogue']
 
-        if speaker.lower() == candidate_name.lower():
-            candidate_utterances.append(utterance)
-        elif speaker.lower() == interviewer_name.lower():
-            interviewer_utterances.append(utterance)
-        else:
-            print(f"Warning: Unknown speaker: {speaker}. Skipping utterance.")
+def sentiment_by_window(sentence_scores, window_seconds=60, field='compound'):
+    """
+    Averages a score per speaker over fixed time windows.
+
+    Sentences whose turn has no usable time are left out.
 
-    # Initialize sentiment analyzer
-    analyzer = SentimentIntensityAnalyzer()
+    Args:
+        sentence_scores (numpy.ndarray): Rows as returned by score_sentences.
+        window_seconds (float): Width of each time window.
+        field (str): The score column to average.
 
-    def calculate_average_sentiment(utterances):
-        """Calculates the average sentiment score for a list of utterances.
+    Returns:
+        dict: Maps each speaker role to a list of {'start', 'average', 'sentences'} dictionaries,
+              one per window that has sentences, ordered by window start (in seconds).
+    """
+    timed = sentence_scores[~np.isnan(sentence_scores['time'])]
+    windows = (timed['time'] // window_seconds).astype(np.int64)
+
+    # Group by (speaker, window) through a combined key
+    keys = windows * len(SPEAKER_IDS) + timed['speaker']
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=timed[field])
+
+    timeline = {role: [] for role in SPEAKER_IDS}
+    roles = {speaker_id: role for role, speaker_id in SPEAKER_IDS.items()}
+    for key, total, count in zip(unique_keys.tolist(), sums.tolist(), counts.tolist()):
+        window, speaker_id = divmod(key, len(SPEAKER_IDS))
+        timeline[roles[speaker_id]].append({
+            'start': window * window_seconds,
+            'average': total / count,
+            'sentences': count
+        })
+    return timeline
+
+
+def sentiment_percentiles(sentence_scores, percentiles=(10, 25, 50, 75, 90), field='compound'):
+    """
+    Computes percentiles of a score per speaker.
 
-        Args:
-            utterances (list): A list of strings, where each string is an utterance.
+    Args:
+        sentence_scores (numpy.ndarray): Rows as returned by score_sentences.
+        percentiles (tuple): The percentiles to compute, between 0 and 100.
+        field (str): The score column to summarize.
 
-        Returns:
-            dict: A dictionary containing the average compound, positive, neutral, and negative sentiment scores.
-                 Returns None if the list of utterances is empty.
-        """
-        if not utterances:
+    Returns:
+        dict: Maps each speaker role to a {percentile: value} dictionary, or to None if the
+              speaker has no scored sentences.
+    """
+    result = {}
+    for role, speaker_id in SPEAKER_IDS.items():
+        values = sentence_scores[field][sentence_scores['speaker'] == speaker_id]
+        if not len(values):
+            result[role] = None
+            continue
+        result[role] = dict(zip(percentiles, np.percentile(values, percentiles).tolist()))
+    return result
+
+
+def analyze_sentiment(transcript):
+    """
+    Analyzes the sentiment of the candidate and interviewer in a mock interview transcript.
+
+    Args:
+        transcript (Transcript or str): A loaded Transcript, or a path to the JSON file containing the interview transcript.
+
+    Returns:
+        dict: A dictionary containing the average sentiment scores for the candidate and interviewer.
+               Returns None if the JSON file is invalid or empty.  Also returns None if no turns exist
+    """
+
+    if not isinstance(transcript, Transcript):
+        transcript_json_file = transcript
+        try:
+            transcript = load_transcript(transcript_json_file)
+        except FileNotFoundError:
+            logger.error("File not found: %s", transcript_json_file)
+            return None
+        except json.JSONDecodeError:
+            logger.error("Invalid JSON in file: %s", transcript_json_file)
+            return None
+        except ValueError as e:
+            logger.error("%s", e)
             return None
 
-        compound_scores = []
-        positive_scores = []
-        negative_scores = []
-        neutral_scores = []
-
-        for utterance in utterances:
-            # Split the utterance into sentences to increase accuracy
-            sentences = tokenize.sent_tokenize(utterance)
-            for sentence in sentences:
-                # Clean the sentence to remove non-alphanumeric characters (except spaces and basic punctuation) to improve sentiment accuracy
-                cleaned_sentence = re.sub(r"[^a-zA-Z0-9\s.,?!']", "", sentence)  # More robust cleaning
-
-                scores = analyzer.polarity_scores(cleaned_sentence)  # Pass sentence by sentence
-                compound_scores.append(scores['compound'])
-                positive_scores.append(scores['pos'])
-                negative_scores.append(scores['neg'])
-                neutral_scores.append(scores['neu'])
-
-        avg_compound = sum(compound_scores) / len(compound_scores)
-        avg_positive = sum(positive_scores) / len(positive_scores)
-        avg_negative = sum(negative_scores) / len(negative_scores)
-        avg_neutral = sum(neutral_scores) / len(neutral_scores)
+    if not transcript.turns:
+        logger.error("No turns found in the transcript %s", transcript.source or '')
+        return None
 
-        return {
-            'compound': avg_compound,
-            'positive': avg_positive,
-            'negative': avg_negative,
-            'neutral': avg_neutral
-        }
+    candidate_turns = []
+    interviewer_turns = []
 
-    candidate_sentiment = calculate_average_sentiment(candidate_utterances)
-    interviewer_sentiment = calculate_average_sentiment(interviewer_utterances)
+    # Speakers are resolved as for speaker-scoped rubric criteria, see transcript.resolve_role()
+    roles = transcript.roles
 
-    return {
-        'candidate': candidate_sentiment,
-        'interviewer': interviewer_sentiment
-    }
+    # Skipped turns are counted here and reported once per transcript after the loop
+    warnings = log_config.WarningTally(logger)
+
+    for turn_index, turn in enumerate(transcript.turns):
+        if not isinstance(turn, dict) or 'speaker' not in turn or 'dialogue' not in turn:
+            warnings.add("turns skipped for invalid format (expected 'speaker' and 'dialogue')")
+            continue
+
+        role = roles[turn_index]
+        if role == 'candidate':
+            candidate_turns.append(turn_index)
+        elif role == 'interviewer':
+            interviewer_turns.append(turn_index)
+        else:
+            warnings.add("turns skipped for unknown speaker", turn['speaker'])
+
+    warnings.flush(transcript.source)
+
+    sentence_scores = score_sentences(transcript, {
+        'candidate': candidate_turns,
+        'interviewer': interviewer_turns
+    })
+    return average_by_speaker(sentence_scores)
 
 
 def summarize_sentiment(sentiment_results):
@@ -189,13 +323,13 @@ def summarize_sentiment(sentiment_results):
 
 # Example usage
 if __name__ == "__main__":
+    log_config.configure()
     transcript_file = "interview_transcript.json"
     output_file = "sentiment_summary.json"  # JSON output file
 
     try:
-        with open(transcript_file, 'r') as f:
-            data = json.load(f)
-        interview_data = data.get('interview', {}) #extract interview object
+        transcript = load_transcript(transcript_file)
+        interview_data = transcript.metadata
 
         # Extract metadata
         date = interview_data.get('date')
@@ -204,15 +338,16 @@ if __name__ == "__main__":
         interviewer_name = interview_data.get('interviewer')
         question = interview_data.get('question')
 
-    except (FileNotFoundError, json.JSONDecodeError, AttributeError) as e:
-        print(f"Error loading and extracting metadata: {e}")
+    except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+        logger.error("Error loading and extracting metadata: %s", e)
+        transcript = transcript_file
         date = None
         position = None
         candidate_name = None
         interviewer_name = None
         question = None
 
-    results = analyze_sentiment(transcript_file)
+    results = analyze_sentiment(transcript)
 
     if results:
         sentiment_summary = summarize_sentiment(results)
@@ -245,9 +380,9 @@ if __name__ == "__main__":
         try:
             with open(output_file, "w") as outfile:
                 json.dump(output_data, outfile, indent=4)
-            print(f"Sentiment summary written to {output_file}")
+            logger.info("Sentiment summary written to %s", output_file)
         except IOError as e:
-            print(f"Error writing to file: {e}")
+            logger.error("Error writing to file: %s", e)
 
     else:
-        print("Sentiment analysis failed. Check the error messages above.")
\ No newline at end of file
+        logger.error("Sentiment analysis failed. Check the error messages above.")
\ No newline at end of file
@@ -1,4 +1,8 @@
 import json
+import logging
+import log_config
+
+logger = logging.getLogger(__name__)
 
 def synthesize_feedback_with_sentiment(analysis_file="analysis_output.json", sentiment_file="sentiment_summary.json", output_file="synthesis_output_with_sentiment.json"):
     """
@@ -17,10 +21,10 @@ def synthesize_feedback_with_sentiment(analysis_file="analysis_output.json", sen
             analysis_data = json.load(f_analysis)
             sentiment_data = json.load(f_sentiment)
     except FileNotFoundError as e:
-        print(f"Error: Input file not found: {e}")
+        logger.error("Input file not found: %s", e)
         return
     except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON format in file: {e}")
+        logger.error("Invalid JSON format in file: %s", e)
         return
 
     analysis_metadata = analysis_data.get("interview_metadata", {})
@@ -30,7 +34,7 @@ def synthesize_feedback_with_sentiment(analysis_file="analysis_output.json", sen
     metadata_keys_to_check = ["date", "position", "candidate", "interviewer"]
     for key in metadata_keys_to_check:
         if analysis_metadata.get(key) != sentiment_metadata.get(key):
-            print(f"Warning: Interview metadata mismatch for key '{key}'. Synthesis may be inaccurate.")
+            logger.warning("Interview metadata mismatch for key '%s'. Synthesis may be inaccurate.", key)
             break
 
     scores = analysis_data.get("scores", {})
@@ -93,6 +97,7 @@ def synthesize_feedback_with_sentiment(analysis_file="analysis_output.json", sen
         "interview_metadata": analysis_metadata,
         "scores": scores,
         "assessment_details": assessment_details,
+        "evidence": analysis_data.get("evidence", {}),
         "pass_fail": pass_fail_status,
         "synthesis_and_recommendation": synthesis_and_recommendation,
         "candidate_sentiment": sentiment_data.get("interview", {}).get("candidate_sentiment", {}), # Include sentiment data in output
@@ -102,10 +107,11 @@ def synthesize_feedback_with_sentiment(analysis_file="analysis_output.json", sen
     try:
         with open(output_file, 'w') as f:
             json.dump(output_data, f, indent=4)
-        print(f"Synthesis and recommendation with sentiment saved to: {output_file}")
+        logger.info("Synthesis and recommendation with sentiment saved to: %s", output_file)
     except Exception as e:
-        print(f"Error writing to output file: {e}")
+        logger.error("Error writing to output file: %s", e)
 
 
 if __name__ == "__main__":
+    log_config.configure()
     synthesize_feedback_with_sentiment()
\ No newline at end of file
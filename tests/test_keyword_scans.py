@@ -0,0 +1,95 @@
+"""
+Checks that every way of scanning a transcript for rubric keywords agrees: the joined
+text, the per-turn segments (bytes for ASCII turns, as read from a corpus) and the
+chunked scans of the incremental analyzer, on randomly generated dialogue.
+"""
+
+import random
+
+from incremental_analyzer import IncrementalAnalyzer
+from token_index import build_indexes, count_words, segment_tokens, tokenize
+from transcript import Transcript
+from transcript_analyzer import default_evaluator
+
+EVALUATOR = default_evaluator()
+MATCHER = EVALUATOR.matcher
+
+# Rubric keywords, near misses and the punctuation transcription tools emit
+WORDS = [
+    "so", "if", "also", "we", "give", "o(n)", "e.g.", "let's", "see", "edge", "case", "time",
+    "complexity", "naïve", "résumé", "set", "reset", "try", "entry", "approach", "brute", "force",
+    "what", "test", "example", "don't", "...", "(", ")", "—", "…", "“what", "if”", "it’s",
+]
+SPEAKERS = ["Alice", "alice", "Bob", "BOB", "Carol", None]
+METADATA = {"candidate": "Alice", "interviewer": "Bob"}
+TRIALS = 200
+
+
+def _random_turns(rng):
+    turns = []
+    for _ in range(rng.randint(1, 10)):
+        turn = {"time": "0:01", "dialogue": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))}
+        speaker = rng.choice(SPEAKERS)
+        if speaker is not None:
+            turn["speaker"] = speaker
+        turns.append(turn)
+    return turns
+
+
+def _segments(dialogues):
+    # ASCII turns as bytes, the way a corpus hands them out; other turns as str
+    lowered = [dialogue.lower() for dialogue in dialogues]
+    return [segment.encode('ascii') if segment.isascii() else segment for segment in lowered]
+
+
+def _add_in_chunks(analyzer, turns, rng):
+    start = 0
+    while start < len(turns):
+        stop = start + rng.randint(1, 3)
+        analyzer.add_turns(turns[start:stop])
+        start = stop
+
+
+def test_unicode_punctuation_separates_words():
+    assert tokenize("approach—brute force…“edge case”") == [
+        "approach", "—", "brute", "force", "…", "“", "edge", "case", "”"]
+    assert segment_tokens("it’s naïve") == [b"it", "’".encode('utf-8'), b"s", "naïve".encode('utf-8')]
+    assert segment_tokens(b"let's see (o(n))") == [b"let's", b"see", b"(", b"o", b"(", b"n", b")", b")"]
+
+
+def test_text_and_segment_scans_agree():
+    rng = random.Random(21)
+    for _ in range(TRIALS):
+        dialogues = [turn["dialogue"] for turn in _random_turns(rng)]
+        text = "".join(dialogue + " " for dialogue in dialogues).lower()
+        found = MATCHER.scan(text, lowered=True)
+
+        index = build_indexes(_segments(dialogues), [None] * len(dialogues), binary=True)[None]
+        assert MATCHER.scan_index(index) == found, dialogues
+        assert index.word_count == count_words(text), dialogues
+
+
+def test_chunked_scan_agrees_with_text_scan():
+    rng = random.Random(22)
+    for _ in range(TRIALS):
+        turns = _random_turns(rng)
+        text = "".join(turn["dialogue"] + " " for turn in turns).lower()
+
+        analyzer = IncrementalAnalyzer(sentiment=False)
+        _add_in_chunks(analyzer, turns, rng)
+        assert +analyzer.keyword_counts[None] == MATCHER.scan(text, lowered=True), turns
+
+
+def test_speaker_scopes_agree():
+    rng = random.Random(23)
+    for _ in range(TRIALS):
+        turns = _random_turns(rng)
+        transcript = Transcript(turns, METADATA)
+        expected = EVALUATOR.evaluate_indexes(transcript.token_indexes())[0]
+
+        segment_indexes = build_indexes(_segments(transcript.dialogues), transcript.roles, binary=True)
+        assert EVALUATOR.evaluate_indexes(segment_indexes)[0] == expected, turns
+
+        analyzer = IncrementalAnalyzer(METADATA, sentiment=False)
+        _add_in_chunks(analyzer, turns, rng)
+        assert analyzer.result() == expected, turns
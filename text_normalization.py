@@ -0,0 +1,54 @@
+"""
+Text Normalization
+
+Prepares utterances for sentiment scoring: each utterance is split into sentences and
+every sentence is stripped of characters other than letters, digits, whitespace and
+basic punctuation (.,?!'). Cleaning uses a precompiled translate table for ASCII text
+(the common case) and a precompiled regex otherwise.
+"""
+
+import re
+
+from nltk_resources import sentence_tokenizer
+
+# Characters removed from sentences before scoring
+_DISALLOWED = re.compile(r"[^a-zA-Z0-9\s.,?!']")
+
+# The same deletion as a translate table, valid for ASCII text
+_ASCII_DELETE_TABLE = str.maketrans('', '', ''.join(
+    char for char in map(chr, range(128)) if _DISALLOWED.match(char)
+))
+
+
+def clean_sentence(sentence):
+    """
+    Removes characters other than letters, digits, whitespace and .,?!' from a sentence.
+
+    Args:
+        sentence (str): The sentence to clean.
+
+    Returns:
+        str: The cleaned sentence.
+    """
+    if sentence.isascii():
+        return sentence.translate(_ASCII_DELETE_TABLE)
+    return _DISALLOWED.sub('', sentence)
+
+
+def normalize_utterance(utterance):
+    """
+    Splits an utterance into sentences and cleans each of them.
+
+    Args:
+        utterance (str): The dialogue of one turn.
+
+    Returns:
+        list: The cleaned sentences, in order.
+    """
+    sentences = sentence_tokenizer().tokenize(utterance)
+
+    # Sentences of an ASCII utterance are ASCII, so the check is done once per utterance
+    if utterance.isascii():
+        return [sentence.translate(_ASCII_DELETE_TABLE) for sentence in sentences]
+    remove = _DISALLOWED.sub
+    return [remove('', sentence) for sentence in sentences]
@@ -0,0 +1,233 @@
+"""
+Token Index
+
+Splits lowercased transcript text into tokens and indexes their positions, so that
+rubric keywords and phrases are matched on whole words: "so" does not match "also"
+or "solution", and "set" does not match "reset".
+
+A token is a run of word characters, optionally joined by apostrophes ("let's"), or
+a single punctuation character ("o(" is the tokens "o" and "("). Word characters are
+Unicode letters, digits and "_"; tokens are separated by whitespace and punctuation,
+including the curly quotes, dashes and ellipses of transcription tools ("approach—brute"
+is the tokens "approach", "—" and "brute").
+
+Plain-ASCII bytes split into the same tokens with an equivalent bytes pattern, so the
+ASCII dialogue of a memory-mapped corpus is indexed without decoding it. Other segments
+are given as str and their tokens encoded to UTF-8.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*|[^\w\s]")
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+# For plain-ASCII bytes only: the ASCII characters str patterns treat as \w and \s
+_BYTES_WORD = b"0-9a-z_"
+_BYTES_SPACE = b" \t\n\r\x0b\x0c\x1c-\x1f"
+
+TOKEN_BYTES_PATTERN = re.compile(
+    b"[" + _BYTES_WORD + b"]+(?:'[" + _BYTES_WORD + b"]+)*|[^" + _BYTES_WORD + _BYTES_SPACE + b"]"
+)
+
+# Matches the first character of word tokens, as opposed to punctuation tokens
+_WORD_START = re.compile(r"\w")
+
+
+def tokenize(text):
+    """
+    Splits lowercased text into tokens.
+
+    Args:
+        text (str): Lowercased text.
+
+    Returns:
+        list: The tokens, in order.
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+def segment_tokens(segment):
+    """
+    Splits a lowercased segment into tokens as bytes.
+
+    Args:
+        segment: Plain-ASCII bytes-like text, such as a memoryview of a corpus, which is split
+                 without decoding; or str text, whose tokens are encoded to UTF-8.
+
+    Returns:
+        list: The tokens, as bytes.
+    """
+    if isinstance(segment, str):
+        return [token.encode('utf-8') for token in TOKEN_PATTERN.findall(segment)]
+    return TOKEN_BYTES_PATTERN.findall(segment)
+
+
+def count_words(text):
+    """Returns the number of word tokens (not punctuation) in lowercased text."""
+    return len(WORD_PATTERN.findall(text))
+
+
+def token_start(text, position):
+    """
+    Returns the offset in a lowercased text at which its token at a position starts,
+    e.g. to point at a keyword hit within one turn's dialogue.
+
+    Args:
+        text (str): Lowercased text.
+        position (int): Position of the token in the text's tokens.
+
+    Returns:
+        int: The character offset, or None if the text has fewer tokens.
+    """
+    for match in islice(TOKEN_PATTERN.finditer(text), position, position + 1):
+        return match.start()
+    return None
+
+
+class TokenIndex:
+    """
+    Positional inverted index of the tokens of one lowercased text.
+
+    Token postings are built once, in one pass, on the first lookup; the postings of a
+    phrase are found from those of its first token on first lookup and cached, so every
+    later lookup of a token or phrase is a dictionary probe.
+
+    An index of several texts (e.g. turns) records the token position at which each
+    text starts, so a hit can be mapped back to its text by binary search.
+    """
+
+    def __init__(self, tokens, binary=False, text_starts=None, text_ids=None):
+        """
+        Args:
+            tokens (list): The tokens of the text, as str or (for byte segments) as bytes.
+            binary (bool): Whether the tokens are bytes.
+            text_starts (array, optional): The position of the first token of each indexed text,
+                                           as an array('I'). Defaults to a single text.
+            text_ids (array, optional): The number of each indexed text in the sequence it came
+                                        from, e.g. its turn index. Defaults to 0, 1, 2, ...
+        """
+        self.tokens = tokens
+        self.binary = binary
+        self.text_starts = array('I', [0]) if text_starts is None else text_starts
+        self.text_ids = text_ids
+        self._postings = None
+        self._phrase_postings = {}
+        self._word_count = None
+
+    @classmethod
+    def from_text(cls, text, lowered=False):
+        """
+        Indexes a text.
+
+        Args:
+            text (str): The text to index.
+            lowered (bool): Whether the text is already lowercase, to skip that copy.
+        """
+        return cls(TOKEN_PATTERN.findall(text if lowered else text.lower()))
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _token_postings(self):
+        if self._postings is None:
+            postings = {}
+            for position, token in enumerate(self.tokens):
+                token_postings = postings.get(token)
+                if token_postings is None:
+                    postings[token] = [position]
+                else:
+                    token_postings.append(position)
+            self._postings = postings
+        return self._postings
+
+    @property
+    def word_count(self):
+        """The number of word tokens, i.e. tokens that are not punctuation."""
+        if self._word_count is None:
+            punctuation = sum(len(positions) for token, positions in self._token_postings().items()
+                              if not _WORD_START.match(token.decode('utf-8') if self.binary else token))
+            self._word_count = len(self.tokens) - punctuation
+        return self._word_count
+
+    def positions(self, phrase):
+        """
+        Returns the token positions at which a phrase starts.
+
+        Args:
+            phrase (tuple): The tokens of the phrase (at least one), of the same type as the indexed tokens.
+
+        Returns:
+            list: Ascending token positions; do not modify.
+        """
+        postings = self._token_postings()
+        if len(phrase) == 1:
+            return postings.get(phrase[0], [])
+        positions = self._phrase_postings.get(phrase)
+        if positions is None:
+            tokens = self.tokens
+            length = len(phrase)
+            rest = list(phrase[1:])
+            positions = [position for position in postings.get(phrase[0], ())
+                         if tokens[position + 1:position + length] == rest]
+            self._phrase_postings[phrase] = positions
+        return positions
+
+    def count(self, phrase):
+        """Returns the number of occurrences of a phrase (a tuple of tokens)."""
+        return len(self.positions(phrase))
+
+    def locate(self, position):
+        """
+        Maps a token position back to its indexed text, by binary search over text_starts.
+
+        Args:
+            position (int): A token position, e.g. from positions().
+
+        Returns:
+            tuple: (the text's id from text_ids, or its number if the index has none,
+                   position of the token within that text).
+        """
+        number = bisect_right(self.text_starts, position) - 1
+        text_id = number if self.text_ids is None else self.text_ids[number]
+        return text_id, position - self.text_starts[number]
+
+
+def build_indexes(texts, groups, binary=False):
+    """
+    Indexes a sequence of lowercased texts, such as the dialogue of each turn, as one text
+    and per group (e.g. per speaker role), tokenizing each text once.
+
+    Args:
+        texts (iterable): Lowercased str texts, or segments as taken by segment_tokens() if binary.
+        groups (iterable): The group of each text, or None for texts that belong to no group.
+        binary (bool): Whether the texts are bytes.
+
+    Returns:
+        dict: Maps None to the index of all texts, as if joined with a space after each,
+              and every group that has texts to the index of its texts. The text_ids of a
+              group's index are the numbers of its texts in the sequence.
+    """
+    split = segment_tokens if binary else TOKEN_PATTERN.findall
+    tokens = []
+    text_starts = array('I')
+    grouped = {}
+    for number, (text, group) in enumerate(zip(texts, groups)):
+        text_tokens = split(text)
+        text_starts.append(len(tokens))
+        tokens.extend(text_tokens)
+        if group is not None:
+            entry = grouped.get(group)
+            if entry is None:
+                entry = grouped[group] = ([], array('I'), array('I'))
+            group_tokens, group_starts, group_ids = entry
+            group_starts.append(len(group_tokens))
+            group_ids.append(number)
+            group_tokens.extend(text_tokens)
+
+    indexes = {group: TokenIndex(group_tokens, binary, group_starts, group_ids)
+               for group, (group_tokens, group_starts, group_ids) in grouped.items()}
+    indexes[None] = TokenIndex(tokens, binary, text_starts)
+    return indexes
@@ -0,0 +1,220 @@
+"""
+In-memory Transcript
+
+Loads a transcript (JSON, or text converted in memory) once so that the sentiment and
+rubric analyzers can share the parsed turns, their token indexes and the sentence
+splits instead of each re-reading the file.
+"""
+
+import json
+import math
+import os
+
+from instrumentation import timer
+from token_index import build_indexes
+
+# Speaker roles, in the order results list them
+ROLES = ('candidate', 'interviewer')
+
+
+def resolve_role(speaker, candidate, interviewer):
+    """
+    Resolves a turn's speaker name to a role by case-insensitive comparison with the
+    interview's candidate and interviewer names.
+
+    Args:
+        speaker: The turn's speaker name.
+        candidate (str): The candidate's name.
+        interviewer (str): The interviewer's name.
+
+    Returns:
+        str: 'candidate' or 'interviewer', or None if the speaker is neither (or not a name).
+    """
+    if not isinstance(speaker, str):
+        return None
+    speaker = speaker.lower()
+    if speaker == candidate.lower():
+        return 'candidate'
+    if speaker == interviewer.lower():
+        return 'interviewer'
+    return None
+
+
+class Transcript:
+    """
+    A parsed interview transcript.
+
+    Attributes:
+        metadata (dict): Interview-level fields (date, position, candidate, interviewer, question, ...).
+        turns (list): The transcript turns as dictionaries with 'speaker', 'time' and 'dialogue'.
+        speakers (list): The speaker of each turn, or None if the turn has none.
+        times (list): The time of each turn, or None if the turn has none.
+        dialogues (list): The dialogue of each turn ('' if the turn has none).
+        source (str): Path the transcript was loaded from, if any.
+    """
+
+    def __init__(self, turns, metadata=None, source=None):
+        self.metadata = metadata or {}
+        self.turns = turns
+        self.source = source
+
+        self.speakers = []
+        self.times = []
+        self.dialogues = []
+        for turn in turns:
+            if not isinstance(turn, dict):
+                turn = {}
+            self.speakers.append(turn.get('speaker'))
+            self.times.append(turn.get('time'))
+            self.dialogues.append(turn.get('dialogue', ''))
+
+        self._roles = None
+        self._token_indexes = None
+        self._normalized_sentences = {}
+
+    @classmethod
+    def from_dict(cls, data, source=None):
+        """
+        Builds a Transcript from the JSON transcript structure.
+
+        Args:
+            data (dict): Parsed JSON with an 'interview' dictionary containing a 'transcript' list
+                         (a top-level 'transcript' list is also accepted).
+            source (str, optional): Path the data was loaded from.
+
+        Returns:
+            Transcript: The parsed transcript.
+
+        Raises:
+            ValueError: If no transcript list can be found.
+        """
+        if isinstance(data, dict) and isinstance(data.get('interview'), dict) and isinstance(data['interview'].get('transcript'), list):
+            interview_data = data['interview']
+        elif isinstance(data, dict) and isinstance(data.get('transcript'), list):
+            interview_data = data
+        else:
+            raise ValueError("Invalid JSON format. Expected a dictionary with an 'interview' dictionary containing a 'transcript' list.")
+
+        metadata = {key: value for key, value in interview_data.items() if key != 'transcript'}
+        return cls(interview_data['transcript'], metadata, source)
+
+    @property
+    def candidate(self):
+        return self.metadata.get('candidate', 'Candidate')
+
+    @property
+    def interviewer(self):
+        return self.metadata.get('interviewer', 'Interviewer')
+
+    def turn(self, turn_index):
+        """Returns one turn as a dictionary (empty if the turn is malformed)."""
+        turn = self.turns[turn_index]
+        return turn if isinstance(turn, dict) else {}
+
+    @property
+    def roles(self):
+        """The role of each turn's speaker ('candidate', 'interviewer' or None), see resolve_role()."""
+        if self._roles is None:
+            candidate = self.candidate
+            interviewer = self.interviewer
+            self._roles = [resolve_role(speaker, candidate, interviewer) for speaker in self.speakers]
+        return self._roles
+
+    @property
+    def token_index(self):
+        """Token index of the lowercased dialogue of all speakers, for whole-word keyword matching."""
+        return self.token_indexes()[None]
+
+    def token_indexes(self):
+        """
+        Returns the token indexes of the lowercased dialogue, built once in a single pass over the turns.
+
+        Returns:
+            dict: Maps None to the index of all dialogue and each role in ROLES that has turns
+                  to the index of that speaker's dialogue.
+        """
+        if self._token_indexes is None:
+            self._token_indexes = build_indexes((dialogue.lower() for dialogue in self.dialogues), self.roles)
+        return self._token_indexes
+
+    def normalized_sentences(self, turn_index):
+        """
+        Splits the dialogue of a turn into cleaned sentences ready for sentiment scoring, caching the result.
+
+        Args:
+            turn_index (int): Index of the turn.
+
+        Returns:
+            list: The normalized sentences of the turn's dialogue.
+        """
+        sentences = self._normalized_sentences.get(turn_index)
+        if sentences is None:
+            from text_normalization import normalize_utterance
+            sentences = normalize_utterance(self.dialogues[turn_index])
+            self._normalized_sentences[turn_index] = sentences
+        return sentences
+
+
+def time_to_seconds(time):
+    """
+    Converts a turn time such as '0:05', '12:30' or '1:02:03' to seconds.
+
+    Args:
+        time (str): The turn time, as [[hours:]minutes:]seconds.
+
+    Returns:
+        float: The time in seconds, or NaN if it is missing or not a time.
+    """
+    if not time:
+        return math.nan
+    seconds = 0.0
+    try:
+        for part in str(time).strip().split(':'):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return math.nan
+    return seconds
+
+
+def load_transcript(transcript_file, pattern=None, metadata=None):
+    """
+    Reads and parses a transcript file exactly once.
+
+    Text files are converted in memory with transcript_converter; nothing is written to disk.
+    An interview stored in a corpus can be loaded with a "<corpus path>#<interview id>" reference.
+
+    Args:
+        transcript_file (str): Path to a .json, .jsonl or .txt transcript, or a corpus reference.
+        pattern (str, optional): Custom line pattern for text transcripts.
+        metadata (dict, optional): Metadata for text transcripts.
+
+    Returns:
+        Transcript: The parsed transcript.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If a JSON file is invalid.
+        ValueError: If the file has no transcript list.
+    """
+    with timer('load'):
+        if '#' in transcript_file and not os.path.isfile(transcript_file):
+            from corpus import load_interview
+            return load_interview(transcript_file)
+
+        if transcript_file.endswith('.txt'):
+            from transcript_converter import parse_text_file
+            data, _ = parse_text_file(transcript_file, pattern, metadata)
+        elif transcript_file.endswith('.jsonl'):
+            # JSON Lines: the transcript structure without its turns, then one turn per line
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                data = json.loads(f.readline() or '{}')
+                turns = [json.loads(line) for line in f if line.strip()]
+            if isinstance(data, dict) and isinstance(data.get('interview'), dict):
+                data['interview']['transcript'] = turns
+            elif isinstance(data, dict):
+                data['transcript'] = turns
+        else:
+            with open(transcript_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        return Transcript.from_dict(data, source=transcript_file)
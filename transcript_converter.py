@@ -8,65 +8,177 @@ A script that converts text transcripts into a structured JSON format.
 import json
 import re
 import argparse
+import logging
 import os
 from datetime import datetime
 
+import log_config
+from instrumentation import count, timer
 
-def parse_transcript_line(line, pattern=None):
+logger = logging.getLogger(__name__)
+
+# Default grammar, one alternative per line format, tried in order:
+#   Speaker [Time]: Dialogue
+#   Speaker: Dialogue
+#   Dialogue
+# Whitespace is matched with [^\S\n] and text with [^\n] so that a match never runs past
+# the end of its line, which lets a whole buffer be parsed with one finditer sweep.
+# Surrounding whitespace is stripped from each field afterwards.
+_DEFAULT_GRAMMAR = re.compile(r"""
+    ^
+    (?:
+        (?P<speaker_timed>[^\n]*?)[^\S\n]*\[(?P<time>[^\]\n]+)\]:(?P<dialogue_timed>[^\n]*)
+      | (?P<speaker>[^\n]*?):(?P<dialogue>[^\n]*)
+      | (?P<dialogue_only>[^\n]*)
+    )
+    $
+""", re.MULTILINE | re.VERBOSE)
+
+# Fields of a custom pattern's named groups, in output order
+_FIELDS = ('speaker', 'time', 'dialogue')
+
+# Characters read per chunk when parsing a stream
+_CHUNK_SIZE = 1024 * 1024
+
+
+class TranscriptLineParser:
     """
-    Parse a single line of transcript according to specified pattern.
-    Returns a dictionary with speaker, time (if available), and dialogue.
+    Parses transcript lines with a grammar compiled once.
+    
+    Without a pattern, the default grammar handles "Speaker [Time]: Dialogue",
+    "Speaker: Dialogue" and bare dialogue lines. A custom pattern (a string or a
+    compiled regex) may define 'speaker', 'time' and 'dialogue' named groups;
+    lines it does not match are treated as dialogue only.
     """
-    if not pattern:
-        # Default pattern: Speaker [Time]: Dialogue
-        # Also handles Speaker: Dialogue format
-        patterns = [
-            r'^(.*?)\s*\[([^\]]+)\]:\s*(.*)$',  # Speaker [Time]: Dialogue
-            r'^(.*?):\s*(.*)$'                   # Speaker: Dialogue
-        ]
+    
+    def __init__(self, pattern=None):
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+    
+    def parse_line(self, line):
+        """
+        Parse a single line, returning a dictionary with speaker, time (if available), and dialogue.
+        """
+        if self.pattern is None:
+            match = _DEFAULT_GRAMMAR.match(line.strip())
+            return self._default_entry(match)
+        return self._custom_entry(line.strip())
+    
+    def parse_buffer(self, buffer):
+        """
+        Parse every non-empty line of a text buffer, yielding one turn record per line.
         
-        for p in patterns:
-            match = re.match(p, line.strip())
-            if match:
-                if len(match.groups()) == 3:
-                    return {
-                        "speaker": match.group(1).strip(),
-                        "time": match.group(2).strip(),
-                        "dialogue": match.group(3).strip()
-                    }
-                elif len(match.groups()) == 2:
-                    return {
-                        "speaker": match.group(1).strip(),
-                        "dialogue": match.group(2).strip()
-                    }
+        With the default grammar the buffer is parsed in a single finditer sweep.
+        """
+        if self.pattern is None:
+            default_entry = self._default_entry
+            for match in _DEFAULT_GRAMMAR.finditer(buffer):
+                entry = default_entry(match)
+                # Blank lines give an empty bare-dialogue entry, which is skipped
+                if len(entry) > 1 or entry["dialogue"]:
+                    yield entry
+            return
         
-        # If no pattern matches, treat the entire line as dialogue
-        return {"dialogue": line.strip()}
-    else:
-        # Use custom regex pattern
-        match = re.match(pattern, line.strip())
-        if match:
-            result = {}
-            if 'speaker' in pattern.groupindex:
-                result["speaker"] = match.group('speaker').strip()
-            if 'time' in pattern.groupindex:
-                result["time"] = match.group('time').strip()
-            if 'dialogue' in pattern.groupindex:
-                result["dialogue"] = match.group('dialogue').strip()
-            return result
+        custom_entry = self._custom_entry
+        for line in buffer.split('\n'):
+            line = line.strip()
+            if line:
+                entry = custom_entry(line)
+                if entry:
+                    yield entry
+    
+    def parse_stream(self, stream, chunk_size=_CHUNK_SIZE):
+        """
+        Parse a text stream in fixed-size chunks cut at line ends, so memory stays constant.
+        """
+        remainder = ''
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            buffer = remainder + chunk
+            cut = buffer.rfind('\n') + 1
+            remainder = buffer[cut:]
+            yield from self.parse_buffer(buffer[:cut])
+        if remainder:
+            yield from self.parse_buffer(remainder)
+    
+    @staticmethod
+    def _default_entry(match):
+        speaker_timed, time, dialogue_timed, speaker, dialogue, dialogue_only = match.groups()
+        if time is not None:
+            return {
+                "speaker": speaker_timed.strip(),
+                "time": time.strip(),
+                "dialogue": dialogue_timed.strip()
+            }
+        if speaker is not None:
+            return {
+                "speaker": speaker.strip(),
+                "dialogue": dialogue.strip()
+            }
+        # If no format matches, treat the entire line as dialogue
+        return {"dialogue": dialogue_only.strip()}
+    
+    def _custom_entry(self, line):
+        match = self.pattern.match(line)
+        if not match:
+            # If custom pattern doesn't match, treat as dialogue only
+            return {"dialogue": line}
         
-        # If custom pattern doesn't match, treat as dialogue only
-        return {"dialogue": line.strip()}
+        result = {}
+        for field in _FIELDS:
+            if field in self.pattern.groupindex:
+                result[field] = (match.group(field) or '').strip()
+        return result
+
+
+_parsers = {}
 
 
-def process_file(file_path, pattern=None, output_path=None, metadata=None):
+def get_line_parser(pattern=None):
     """
-    Process a transcript file and convert it to JSON.
+    Return a TranscriptLineParser for the pattern, compiling each pattern only once.
     """
-    # Ensure output_path exists
-    if not output_path:
-        output_path = os.path.splitext(file_path)[0] + ".json"
+    parser = _parsers.get(pattern)
+    if parser is None:
+        parser = _parsers[pattern] = TranscriptLineParser(pattern)
+    return parser
+
+
+def parse_transcript_line(line, pattern=None):
+    """
+    Parse a single line of transcript according to specified pattern.
+    Returns a dictionary with speaker, time (if available), and dialogue.
+    """
+    return get_line_parser(pattern).parse_line(line)
+
 
+def iter_transcript_entries(lines, pattern=None):
+    """
+    Parse transcript lines lazily, yielding one turn record per non-empty line.
+    """
+    parse_line = get_line_parser(pattern).parse_line
+    for line in lines:
+        if line.strip():
+            entry = parse_line(line)
+            if entry:
+                yield entry
+
+
+def _iter_file_entries(file_path, pattern=None, encoding='utf-8'):
+    """
+    Read a text transcript in chunks, yielding turn records as they are parsed.
+    """
+    with open(file_path, 'r', encoding=encoding) as f:
+        yield from get_line_parser(pattern).parse_stream(f)
+
+
+def _build_structure(metadata=None):
+    """
+    Build the JSON transcript structure without its turns.
+    
+    Returns the structure and the dictionary whose "transcript" key holds the turns.
+    """
     # Initialize the structure
     result = {}
     if metadata:
@@ -76,35 +188,137 @@ def process_file(file_path, pattern=None, output_path=None, metadata=None):
             "date": datetime.now().strftime("%Y-%m-%d"),
             "transcript": []
         }
-
-    # Read and process the file
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-    except UnicodeDecodeError:
-        # Try with a different encoding if UTF-8 fails
-        with open(file_path, 'r', encoding='latin-1') as f:
-            lines = f.readlines()
-    
-    # Filter out empty lines and process each line
-    transcript_data = []
-    for line in lines:
-        if line.strip():
-            entry = parse_transcript_line(line, pattern)
-            if entry:
-                transcript_data.append(entry)
     
     # Determine where to place the transcript data
     if "interview" in result and "transcript" in result["interview"]:
-        result["interview"]["transcript"] = transcript_data
-    else:
-        result["transcript"] = transcript_data
+        return result, result["interview"]
+    return result, result
+
+
+def _with_speakers(entries, container, infer_speakers):
+    """
+    Assign speakers to unlabeled blocks when requested, using the names in the metadata.
+    """
+    if not infer_speakers:
+        return entries
+    from turn_segmenter import assign_speakers
+    return assign_speakers(entries, container.get("candidate", "Candidate"), container.get("interviewer", "Interviewer"))
+
+
+def parse_text_file(file_path, pattern=None, metadata=None, infer_speakers=True):
+    """
+    Parse a text transcript file into the JSON transcript structure, in memory.
+    
+    Transcripts without speaker labels get their speakers inferred by the turn
+    segmenter unless infer_speakers is False.
+    """
+    result, container = _build_structure(metadata)
+    
+    with timer('convert'):
+        try:
+            transcript_data = list(_with_speakers(_iter_file_entries(file_path, pattern), container, infer_speakers))
+        except UnicodeDecodeError:
+            # Try with a different encoding if UTF-8 fails
+            transcript_data = list(_with_speakers(_iter_file_entries(file_path, pattern, encoding='latin-1'), container, infer_speakers))
+    count('turns_parsed', len(transcript_data))
+    
+    container["transcript"] = transcript_data
+    return result, len(transcript_data)
+
+
+def parse_text(text, pattern=None, metadata=None, infer_speakers=True):
+    """
+    Parse transcript text that is already in memory (e.g. a request body) into the JSON transcript structure.
+    
+    Returns the structure and the number of turns, like parse_text_file.
+    """
+    result, container = _build_structure(metadata)
+    with timer('convert'):
+        transcript_data = list(_with_speakers(get_line_parser(pattern).parse_buffer(text), container, infer_speakers))
+    count('turns_parsed', len(transcript_data))
+    container["transcript"] = transcript_data
+    return result, len(transcript_data)
+
+
+def _write_json(out, result, container, entries):
+    """
+    Write the transcript structure as indented JSON, streaming the turns.
+    
+    The output is identical to json.dump(result, indent=2) with the turns in place.
+    """
+    marker = "__transcript_entries__"
+    container["transcript"] = marker
+    head, tail = json.dumps(result, indent=2, ensure_ascii=False).split(json.dumps(marker), 1)
+    container["transcript"] = []
+    
+    # The turns are indented one level deeper than the line holding the "transcript" key
+    key_line = head.rsplit("\n", 1)[-1]
+    indent = key_line[:len(key_line) - len(key_line.lstrip())]
+    item_indent = indent + "  "
+    
+    field_indent = item_indent + "  "
+    encode = json.encoder.encode_basestring
+    
+    out.write(head)
+    count = 0
+    for entry in entries:
+        out.write("[\n" if count == 0 else ",\n")
+        if entry and all(type(value) is str for value in entry.values()):
+            # Turn records are flat string dictionaries; format them directly
+            fields = ",\n".join(f"{field_indent}{encode(key)}: {encode(value)}" for key, value in entry.items())
+            out.write(f"{item_indent}{{\n{fields}\n{item_indent}}}")
+        else:
+            out.write(item_indent + json.dumps(entry, indent=2, ensure_ascii=False).replace("\n", "\n" + item_indent))
+        count += 1
+    out.write("\n" + indent + "]" if count else "[]")
+    out.write(tail)
+    return count
+
+
+def _write_jsonl(out, result, container, entries):
+    """
+    Write the transcript as JSON Lines: the structure without its turns, then one turn per line.
+    """
+    container.pop("transcript", None)
+    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    container["transcript"] = []
+    
+    count = 0
+    for entry in entries:
+        out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def process_file(file_path, pattern=None, output_path=None, metadata=None, jsonl=False, infer_speakers=False):
+    """
+    Process a transcript file and convert it to JSON.
+    
+    The input is read line by line and each turn is written as soon as it is parsed,
+    so memory stays constant regardless of the input size. With jsonl=True (or an
+    output path ending in .jsonl) the output is JSON Lines. With infer_speakers=True
+    unlabeled blocks are attributed to the interviewer or the candidate.
+    """
+    # Ensure output_path exists
+    if not output_path:
+        output_path = os.path.splitext(file_path)[0] + (".jsonl" if jsonl else ".json")
+    if output_path.endswith(".jsonl"):
+        jsonl = True
+    
+    write = _write_jsonl if jsonl else _write_json
     
-    # Write the JSON output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    for encoding in ('utf-8', 'latin-1'):
+        result, container = _build_structure(metadata)
+        try:
+            with timer('convert'), open(output_path, 'w', encoding='utf-8') as out:
+                entry_count = write(out, result, container,
+                                    _with_speakers(_iter_file_entries(file_path, pattern, encoding), container, infer_speakers))
+            break
+        except UnicodeDecodeError:
+            # Try with a different encoding if UTF-8 fails; the output is rewritten from the start
+            continue
     
-    return output_path, len(transcript_data)
+    return output_path, entry_count
 
 
 def process_json_file(file_path, output_path=None):
@@ -168,7 +382,11 @@ def main():
     parser.add_argument('-o', '--output', help='Output file path (default: same as input with .json extension)')
     parser.add_argument('-p', '--pattern', help='Custom regex pattern for parsing lines')
     parser.add_argument('-m', '--metadata', help='JSON file with metadata to include')
+    parser.add_argument('--jsonl', action='store_true', help='Write JSON Lines (metadata line, then one turn per line)')
+    parser.add_argument('--infer-speakers', action='store_true', help='Assign speakers to transcripts without speaker labels')
+    log_config.add_arguments(parser)
     args = parser.parse_args()
+    log_config.configure_from_args(args)
     
     file_path = args.file
     output_path = args.output
@@ -184,15 +402,15 @@ def main():
         # Check if the input is already JSON
         if file_path.lower().endswith('.json'):
             output_file, entry_count = process_json_file(file_path, output_path)
-            print(f"Processed JSON file with {entry_count} transcript entries.")
-            print(f"Output saved to: {output_file}")
+            logger.info("Processed JSON file with %d transcript entries.", entry_count)
+            logger.info("Output saved to: %s", output_file)
         else:
             # Process as a text transcript
-            output_file, entry_count = process_file(file_path, pattern, output_path, metadata)
-            print(f"Processed {entry_count} transcript lines.")
-            print(f"JSON output saved to: {output_file}")
+            output_file, entry_count = process_file(file_path, pattern, output_path, metadata, args.jsonl, args.infer_speakers)
+            logger.info("Processed %d transcript lines.", entry_count)
+            logger.info("JSON output saved to: %s", output_file)
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.error("%s", e)
         return 1
     
     return 0
@@ -10,10 +10,14 @@ and combines the results into a CSV file.
 import os
 import csv
 import argparse
+import logging
 from pathlib import Path
+import log_config
 from sentiment_analyzer import analyze_sentiment
 from transcript_analyzer import analyze_transcript
 
+logger = logging.getLogger(__name__)
+
 def process_transcript(transcript_path):
     """
     Process a single transcript file through both analyzers.
@@ -56,7 +60,7 @@ def process_all_transcripts(transcripts_dir='transcripts', output_file='transcri
     """
     # Ensure the transcripts directory exists
     if not os.path.exists(transcripts_dir):
-        print(f"Error: Transcripts directory '{transcripts_dir}' not found.")
+        logger.error("Transcripts directory '%s' not found.", transcripts_dir)
         return
     
     # Get all .txt files in the transcripts directory
@@ -64,14 +68,14 @@ def process_all_transcripts(transcripts_dir='transcripts', output_file='transcri
                        if f.endswith('.txt') and os.path.isfile(os.path.join(transcripts_dir, f))]
     
     if not transcript_files:
-        print(f"No transcript files found in '{transcripts_dir}'.")
+        logger.error("No transcript files found in '%s'.", transcripts_dir)
         return
     
     results = []
     
     # Process each transcript file
     for transcript_file in transcript_files:
-        print(f"Processing {transcript_file}...")
+        logger.info("Processing %s...", transcript_file)
         result = process_transcript(transcript_file)
         results.append(result)
     
@@ -88,9 +92,9 @@ def process_all_transcripts(transcripts_dir='transcripts', output_file='transcri
             writer.writeheader()
             writer.writerows(results)
         
-        print(f"Analysis complete. Results saved to {output_file}")
+        logger.info("Analysis complete. Results saved to %s", output_file)
     else:
-        print("No results to write to CSV.")
+        logger.error("No results to write to CSV.")
 
 def main():
     """Main function to parse arguments and run the pipeline."""
@@ -100,13 +104,15 @@ def main():
     parser.add_argument('--output', default='transcript_analysis_results.csv',
                         help='Output CSV file path (default: transcript_analysis_results.csv)')
     parser.add_argument('--file', help='Process a single transcript file instead of the entire directory')
+    log_config.add_arguments(parser)
     
     args = parser.parse_args()
+    log_config.configure_from_args(args)
     
     if args.file:
         # Process a single file
         if not os.path.isfile(args.file):
-            print(f"Error: File '{args.file}' not found.")
+            logger.error("File '%s' not found.", args.file)
             return
             
         result = process_transcript(args.file)
@@ -118,7 +124,7 @@ def main():
             writer.writeheader()
             writer.writerow(result)
             
-        print(f"Analysis complete. Results saved to {args.output}")
+        logger.info("Analysis complete. Results saved to %s", args.output)
     else:
         # Process all files in the directory
         process_all_transcripts(args.dir, args.output)
@@ -0,0 +1,166 @@
+"""
+Turn Segmenter
+
+Assigns speakers to transcript blocks that have none, such as the paragraphs of an
+automatic recording transcript without "Speaker:" prefixes. Each block is scored with
+a few cheap conversational cues and attributed to the interviewer or the candidate:
+
+    - greetings and interview prompts ("good morning", "tell me about", "walk me through")
+      and addressing the candidate by name point to the interviewer;
+    - a block that ends with a question is likely the interviewer's;
+    - first-person working talk ("I think", "let me", "I'm gonna") points to the candidate;
+    - a block that follows a question is likely the answer, so it leans the other way.
+
+Blocks without a clear signal keep the previous speaker. The cues are compiled into one
+regular expression and every block is scanned once, so segmentation is linear in the
+length of the text and can run over a stream of turns.
+"""
+
+import re
+
+# Cue words, grouped by the speaker they point to
+_GREETING_CUES = [
+    r"good (?:morning|afternoon|evening)", r"welcome", r"thanks? (?:you )?for (?:joining|coming|your time)",
+    r"nice to meet you",
+]
+_INTERVIEWER_CUES = [
+    r"tell me (?:about|more)", r"walk me through", r"can you", r"could you",
+    r"would you", r"why don't you", r"go ahead", r"share your screen", r"how would you",
+    r"what would you", r"what if", r"take a look", r"any questions",
+]
+_CANDIDATE_CUES = [
+    r"i think", r"i'm", r"i am", r"i'll", r"i will", r"i would", r"i need", r"i can", r"i believe",
+    r"i understand", r"let me", r"let's see", r"my", r"gonna",
+]
+
+# Weights of each cue; a positive total points to the interviewer
+_GREETING_WEIGHT = 2
+_NAME_WEIGHT = 2
+_QUESTION_WEIGHT = 1
+_ANSWER_WEIGHT = 1
+
+
+def _cue_pattern(candidate_names):
+    alternatives = [
+        "(?P<greeting>" + "|".join(_GREETING_CUES) + ")",
+        "(?P<interviewer>" + "|".join(_INTERVIEWER_CUES) + ")",
+        "(?P<candidate>" + "|".join(_CANDIDATE_CUES) + ")",
+    ]
+    if candidate_names:
+        alternatives.append("(?P<name>" + "|".join(re.escape(name.lower()) for name in candidate_names) + ")")
+    # Matched against lowercased text, which is much faster than re.IGNORECASE
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+
+
+def _candidate_names(candidate):
+    # The full name and the first name, unless it is only the generic role label
+    if not candidate or candidate.lower() == 'candidate':
+        return []
+    names = [candidate]
+    first_name = candidate.split()[0]
+    if first_name != candidate:
+        names.append(first_name)
+    return names
+
+
+class TurnSegmenter:
+    """
+    Attributes unlabeled transcript blocks to the interviewer or the candidate.
+    """
+
+    def __init__(self, candidate='Candidate', interviewer='Interviewer'):
+        """
+        Args:
+            candidate (str): Speaker name given to candidate blocks. A real name is also
+                             used as a cue, since the interviewer addresses the candidate by it.
+            interviewer (str): Speaker name given to interviewer blocks.
+        """
+        self.candidate = candidate or 'Candidate'
+        self.interviewer = interviewer or 'Interviewer'
+        self._cues = _cue_pattern(_candidate_names(candidate))
+        # Position in the stream of entries, kept between calls to assign()
+        self._previous = None
+        self._follows_question = False
+        self._labeled = False
+
+    def score(self, dialogue):
+        """
+        Scores a block of dialogue on its own cues.
+
+        Args:
+            dialogue (str): The block's text.
+
+        Returns:
+            int: Positive when the block reads like the interviewer, negative when it reads like the candidate.
+        """
+        score = 0
+        for match in self._cues.finditer(dialogue.lower()):
+            group = match.lastgroup
+            if group == 'greeting':
+                score += _GREETING_WEIGHT
+            elif group == 'interviewer':
+                score += 1
+            elif group == 'name':
+                score += _NAME_WEIGHT
+            else:
+                score -= 1
+
+        if dialogue.rstrip().endswith('?'):
+            score += _QUESTION_WEIGHT
+        return score
+
+    def assign(self, entries):
+        """
+        Fills in the speaker of entries that have none.
+
+        Entries are processed as a stream. Once an entry with a speaker is seen the
+        transcript is treated as labeled and the remaining entries pass through unchanged.
+        Each call continues the stream of the previous one, so a transcript that is
+        still being written can be passed in chunks.
+
+        Args:
+            entries (iterable): Turn dictionaries with a 'dialogue' and optionally a 'speaker'.
+
+        Yields:
+            dict: The turns, with 'speaker' set on blocks that had none.
+        """
+        for entry in entries:
+            if self._labeled or entry.get('speaker'):
+                self._labeled = True
+                yield entry
+                continue
+
+            dialogue = entry.get('dialogue', '')
+            score = self.score(dialogue)
+            previous = self._previous
+            if self._follows_question and previous is not None:
+                # A block right after a question is likely the answer to it
+                score += -_ANSWER_WEIGHT if previous == self.interviewer else _ANSWER_WEIGHT
+
+            if score > 0:
+                speaker = self.interviewer
+            elif score < 0:
+                speaker = self.candidate
+            else:
+                # Interviews open with the interviewer; otherwise keep the current speaker
+                speaker = previous or self.interviewer
+
+            entry = {'speaker': speaker, **entry}
+            self._previous = speaker
+            self._follows_question = dialogue.rstrip().endswith('?')
+            yield entry
+
+
+def assign_speakers(entries, candidate='Candidate', interviewer='Interviewer'):
+    """
+    Fills in the speaker of unlabeled transcript blocks with a TurnSegmenter.
+
+    Args:
+        entries (iterable): Turn dictionaries with a 'dialogue' and optionally a 'speaker'.
+        candidate (str): Speaker name for candidate blocks.
+        interviewer (str): Speaker name for interviewer blocks.
+
+    Returns:
+        generator: The turns, with speakers assigned where they were missing.
+    """
+    return TurnSegmenter(candidate, interviewer).assign(entries)